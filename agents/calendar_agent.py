@@ -1,39 +1,46 @@
 import datetime
-from tools.google_calendar import create_event
+from tools.google_calendar import create_event, create_events
 
 class CalendarAgent:
-    def __init__(self, config):
+    def __init__(self, config, registry=None):
+        # The Calendar service itself is cached process-wide in tools.google_calendar
         self.config = config
 
-    def schedule(self, resume: dict, ranking: dict):
-        """
-        Schedule an interview for candidates with a high score.
-        Returns available slots and a confirmed event link for the first slot.
-        """
-        print(f"\n[CalendarAgent] Scheduling for candidate: {resume.get('name')}")
-
+    def _suggest_slots(self):
         # Generate 3 interview slots dynamically: tomorrow, day after, and next day at 3 PM
         base_date = datetime.datetime.now() + datetime.timedelta(days=1)
-        slots = [
+        return [
             (base_date + datetime.timedelta(days=i)).replace(
                 hour=15, minute=0, second=0, microsecond=0
             )
             for i in range(3)
         ]
 
+    def _event_details(self, resume: dict, ranking: dict, start_time: datetime.datetime) -> dict:
+        return {
+            "summary": f"Interview: {resume['name']}",
+            "description": (
+                f"Interview for {resume['name']} "
+                f"(Score: {ranking['score']})"
+            ),
+            "start_time": start_time,
+            "duration_minutes": 30,
+        }
+
+    def schedule(self, resume: dict, ranking: dict):
+        """
+        Schedule an interview for candidates with a high score.
+        Returns available slots and a confirmed event link for the first slot.
+        """
+        print(f"\n[CalendarAgent] Scheduling for candidate: {resume.get('name')}")
+
+        slots = self._suggest_slots()
+
         # First slot is chosen for creating a real event
         first_slot = slots[0]
 
         # Create a Google Calendar event (real)
-        event_link = create_event(
-            summary=f"Interview: {resume['name']}",
-            description=(
-                f"Interview for {resume['name']} "
-                f"(Score: {ranking['score']})"
-            ),
-            start_time=first_slot,
-            duration_minutes=30,
-        )
+        event_link = create_event(**self._event_details(resume, ranking, first_slot))
 
         slot_strings = [dt.isoformat() for dt in slots]
 
@@ -45,3 +52,26 @@ class CalendarAgent:
 
         print(f"[CalendarAgent] Event created: {event_link}")
         return result
+
+    def schedule_batch(self, candidates: list) -> list:
+        """
+        Schedule interviews for several (resume, ranking) pairs with batched
+        Calendar API requests. Returns one result per pair, in order.
+        """
+        print(f"\n[CalendarAgent] Scheduling {len(candidates)} candidate(s) in one batch")
+
+        slots = self._suggest_slots()
+        slot_strings = [dt.isoformat() for dt in slots]
+        links = create_events([
+            self._event_details(resume, ranking, slots[0])
+            for resume, ranking in candidates
+        ])
+
+        return [
+            {
+                "slots": slot_strings,
+                "calendar_event": link,
+                "status": "slots_suggested" if link else "failed",
+            }
+            for link in links
+        ]
@@ -1,22 +1,42 @@
-import json
 import google.generativeai as genai
 from pydantic import BaseModel
-import re
+from pydantic import ValidationError
+from typing import List, Optional
+from tools.llm_client import CircuitOpenError, LLMExecutor, extract_json, load_fast_model, load_model
+from tools.metrics import METRICS
+from tools.prompt_encoding import PromptEncoder
 
 class CandidateScoreResult(BaseModel):
     score: int
     summary: str
 
+# Only these fields are sent to the model; contact details don't affect the score
+JD_FIELDS = ("role", "skills", "tools", "experience_years", "soft_skills")
+RESUME_FIELDS = ("skills", "experience", "projects", "education")
+
+# Candidates at or above this score are invited to interview
+INVITE_SCORE = 75
+
 class CandidateRanker:
-    def __init__(self, config: dict):
-        genai.configure(api_key=config["gemini_key"])
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+    def __init__(self, config: dict, registry=None):
+        self.model_name = config.get("ranker_model", 'gemini-2.5-pro')
+        self.model = load_model(config, registry, self.model_name)
+        self.fast_model = load_fast_model(config, registry, self.model_name)
+        # In cascade mode, fast-tier scores within this many points of INVITE_SCORE are re-checked
+        self.borderline_band = config.get("cascade_borderline_band", 10)
+        self.batch_size = config.get("rank_batch_size", 8)
+        self.batch_token_budget = config.get("rank_batch_token_budget", 12000)
+        self.encoder = PromptEncoder(config)
+        self.llm = LLMExecutor(config)
 
-    def _build_prompt(self, jd: dict, resume: dict) -> str:
+    def _build_prompt(self, jd: dict, resume: dict):
         """
         Builds a highly constrained prompt to force the model to output a single, valid JSON object.
+        Returns (prompt, tokens saved by the compact encoding).
         """
-        return f"""
+        jd_payload = self.encoder.encode(jd, JD_FIELDS)
+        resume_payload = self.encoder.encode(resume, RESUME_FIELDS)
+        prompt = f"""
 You are a hiring evaluator AI. Your task is to analyze a candidate's resume against a job description.
 
 **Instructions:**
@@ -26,10 +46,10 @@ You are a hiring evaluator AI. Your task is to analyze a candidate's resume agai
 4.  **Crucially, return ONLY a single JSON object. Do not include any other text, conversation, or markdown wrappers like ```json```.**
 
 **Job Description (JD):**
-{json.dumps(jd, indent=2)}
+{jd_payload.text}
 
 **Candidate Resume:**
-{json.dumps(resume, indent=2)}
+{resume_payload.text}
 
 **Output Format (STRICTLY):**
 {{
@@ -37,38 +57,177 @@ You are a hiring evaluator AI. Your task is to analyze a candidate's resume agai
   "summary": "Your detailed explanation here."
 }}
 """
+        return prompt, jd_payload.tokens_saved + resume_payload.tokens_saved
+
+    def _build_batch_prompt(self, jd: dict, resumes: List[dict]):
+        """
+        Packs several resumes into one prompt so the JD is only sent once.
+        Returns (prompt, tokens saved by the compact encoding).
+        """
+        jd_payload = self.encoder.encode(jd, JD_FIELDS)
+        payloads = [self.encoder.encode(resume, RESUME_FIELDS) for resume in resumes]
+        candidates = "\n\n".join(
+            f"**Candidate {i}:**\n{payload.text}"
+            for i, payload in enumerate(payloads)
+        )
+        prompt = f"""
+You are a hiring evaluator AI. Your task is to analyze several candidates' resumes against one job description.
+
+**Instructions:**
+1.  Evaluate every candidate independently; do not compare candidates with each other.
+2.  Assign each candidate a suitability score out of 100, where 100 is a perfect match.
+3.  Provide a 3-4 sentence explanation for each score. The explanation should be a concise summary of the key matching and non-matching points.
+4.  Focus your analysis on: skills, relevant projects, experience, and education.
+5.  **Crucially, return ONLY a single JSON object with exactly one entry per candidate. Do not include any other text, conversation, or markdown wrappers like ```json```.**
+
+**Job Description (JD):**
+{jd_payload.text}
+
+{candidates}
+
+**Output Format (STRICTLY):**
+{{
+  "results": [
+    {{"candidate": 0, "score": 0, "summary": "Your detailed explanation here."}}
+  ]
+}}
+"""
+        return prompt, jd_payload.tokens_saved + sum(p.tokens_saved for p in payloads)
+
+    def _generate_json(self, prompt: str, model, tokens_saved: int = 0, parse=extract_json):
+        tier = "primary" if self.fast_model is None else ("fast" if model is self.fast_model else "strong")
+        METRICS.inc("llm_tier_calls", agent="CandidateRanker", tier=tier)
+        # The safety settings are added to potentially reduce the model's
+        # tendency to add extra text or conversational elements.
+        # Responses that fail `parse` are retried by the LLMExecutor, except on
+        # the fast tier, where they are escalated instead.
+        return self.llm.call(
+            model,
+            prompt,
+            agent="CandidateRanker",
+            parse=parse,
+            tokens_saved=tokens_saved,
+            retry_malformed=tier != "fast",
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json"
+            ),
+            safety_settings={
+                'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
+                'HARM_CATEGORY_SEXUALLY_EXPLICIT': 'BLOCK_NONE',
+                'HARM_CATEGORY_DANGEROUS_CONTENT': 'BLOCK_NONE',
+                'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
+            }
+        )
 
-    def rank(self, jd_data: dict, resume_data: dict) -> CandidateScoreResult:
-        prompt = self._build_prompt(jd_data, resume_data)
-        
+    def _is_borderline(self, result: CandidateScoreResult) -> bool:
+        return abs(result.score - INVITE_SCORE) <= self.borderline_band
+
+    def _split_batches(self, resumes: List[dict]) -> List[List[int]]:
+        """
+        Groups resume indices so each batch stays under both the item cap
+        and the estimated token budget. An oversized resume gets a batch of its own.
+        """
+        batches, current, current_tokens = [], [], 0
+        for i, resume in enumerate(resumes):
+            tokens = self.encoder.encode(resume, RESUME_FIELDS).tokens
+            if current and (
+                len(current) >= self.batch_size
+                or current_tokens + tokens > self.batch_token_budget
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _rank_one(self, jd_data: dict, resume_data: dict, model) -> CandidateScoreResult:
+        prompt, tokens_saved = self._build_prompt(jd_data, resume_data)
+        return self._generate_json(
+            prompt, model, tokens_saved, parse=lambda text: CandidateScoreResult(**extract_json(text))
+        )
+
+    def rank(self, jd_data: dict, resume_data: dict, cascade: bool = True) -> CandidateScoreResult:
+        """
+        Scores one resume. In cascade mode the fast model answers first and the
+        main model is consulted only for malformed or borderline answers.
+        """
         try:
-            # The safety settings are added to potentially reduce the model's
-            # tendency to add extra text or conversational elements.
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    response_mime_type="application/json"
-                ),
-                safety_settings={
-                    'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
-                    'HARM_CATEGORY_SEXUALLY_EXPLICIT': 'BLOCK_NONE',
-                    'HARM_CATEGORY_DANGEROUS_CONTENT': 'BLOCK_NONE',
-                    'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
-                }
-            )
-            text = response.text.strip()
-            
-            # Use regex to find and extract the JSON object robustly
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                clean_text = json_match.group(0)
-            else:
-                raise ValueError("Could not find a JSON object in the model's response.")
-                
-            data = json.loads(clean_text)
-            return CandidateScoreResult(**data)
-            
+            if cascade and self.fast_model is not None:
+                try:
+                    result = self._rank_one(jd_data, resume_data, self.fast_model)
+                    if not self._is_borderline(result):
+                        return result
+                    reason = "borderline"
+                except Exception as e:
+                    reason = "malformed" if isinstance(e, (ValueError, ValidationError)) else "error"
+                METRICS.inc("llm_escalations", agent="CandidateRanker", reason=reason)
+            return self._rank_one(jd_data, resume_data, self.model)
+        except CircuitOpenError:
+            # Surface outages instead of scoring every remaining candidate 0
+            raise
         except Exception as e:
             print(f"An error occurred during ranking: {e}")
             # Return a default error result or re-raise the exception
-            return CandidateScoreResult(score=0, summary="Error processing model response.")
\ No newline at end of file
+            return CandidateScoreResult(score=0, summary="Error processing model response.")
+
+    def _rank_batches(self, jd_data: dict, resumes: List[dict], model) -> List[Optional[CandidateScoreResult]]:
+        """
+        Ranks resumes with one request per batch on `model`. Candidates missing
+        from, or malformed in, a response are left as None.
+        """
+        results = [None] * len(resumes)
+
+        for batch in self._split_batches(resumes):
+            prompt, tokens_saved = self._build_batch_prompt(jd_data, [resumes[i] for i in batch])
+            try:
+                items = self._generate_json(prompt, model, tokens_saved).get("results", [])
+            except CircuitOpenError:
+                # A fast-tier outage just escalates the batch
+                if model is not self.fast_model:
+                    raise
+                items = []
+            except Exception as e:
+                print(f"An error occurred during batch ranking: {e}")
+                items = []
+
+            for item in items if isinstance(items, list) else []:
+                try:
+                    position = int(item["candidate"])
+                    if 0 <= position < len(batch) and results[batch[position]] is None:
+                        results[batch[position]] = CandidateScoreResult(
+                            score=item["score"], summary=item["summary"]
+                        )
+                except Exception:
+                    continue
+
+        return results
+
+    def rank_batch(self, jd_data: dict, resumes: List[dict]) -> List[CandidateScoreResult]:
+        """
+        Ranks many resumes with one request per batch. In cascade mode the fast
+        model ranks everyone first; missing and borderline candidates are then
+        re-ranked together on the main model. Anything still missing is ranked
+        on its own.
+        """
+        results = self._rank_batches(jd_data, resumes, self.fast_model or self.model)
+
+        if self.fast_model is not None:
+            escalate = [i for i, result in enumerate(results) if result is None or self._is_borderline(result)]
+            if escalate:
+                missing = sum(1 for i in escalate if results[i] is None)
+                if missing:
+                    METRICS.inc("llm_escalations", missing, agent="CandidateRanker", reason="malformed")
+                if len(escalate) > missing:
+                    METRICS.inc("llm_escalations", len(escalate) - missing, agent="CandidateRanker", reason="borderline")
+                strong = self._rank_batches(jd_data, [resumes[i] for i in escalate], self.model)
+                for i, result in zip(escalate, strong):
+                    results[i] = result
+
+        for i, result in enumerate(results):
+            if result is None:
+                METRICS.inc("llm_retries", agent="CandidateRanker")
+                results[i] = self.rank(jd_data, resumes[i], cascade=False)
+
+        return results
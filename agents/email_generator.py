@@ -1,27 +1,84 @@
-import json
-import google.generativeai as genai
+import os
+import re
+import threading
 from pydantic import BaseModel
+from tools.llm_client import LLMExecutor, extract_json, load_fast_model, load_model
+from tools.prompt_encoding import PromptEncoder
+from tools.result_cache import ResultCache, get_cache
+
+# The email only needs to address the candidate; the rest of the resume is not sent
+CANDIDATE_FIELDS = ("name",)
+# What the optional personalized sentence may draw on
+PERSONALIZE_FIELDS = ("skills", "projects")
 
 class EmailResult(BaseModel):
     subject: str
     body: str
     type: str  # "invite" or "rejection"
 
+class EmailTemplate(BaseModel):
+    subject: str
+    body: str  # contains {candidate_name}, {role} and {personal_line} slots
+
+# The only slots _render fills in; any other {...} would reach candidates verbatim
+TEMPLATE_SLOTS = ("candidate_name", "role", "personal_line")
+
+def _check_template(template: EmailTemplate) -> EmailTemplate:
+    if "{candidate_name}" not in template.body:
+        raise ValueError("Template body is missing the {candidate_name} slot.")
+    unknown = sorted(
+        set(re.findall(r"\{([^{}]*)\}", template.subject + template.body)) - set(TEMPLATE_SLOTS)
+    )
+    if unknown:
+        raise ValueError(f"Template uses unknown slots: {', '.join('{' + s + '}' for s in unknown)}.")
+    return template
+
+def _parse_template(text: str) -> EmailTemplate:
+    return _check_template(EmailTemplate(**extract_json(text)))
+
 class EmailGenerator:
-    def __init__(self, config: dict):
-        genai.configure(api_key=config["gemini_key"])
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+    def __init__(self, config: dict, registry=None):
+        self.model_name = config.get("email_model", 'gemini-2.5-pro')
+        self.model = load_model(config, registry, self.model_name)
+        self.fast_model = load_fast_model(config, registry, self.model_name)
+        self.encoder = PromptEncoder(config)
+        self.llm = LLMExecutor(config)
+
+        # email_mode="template": one LLM-written template per (role, decision, tone),
+        # rendered locally per candidate; see generate()
+        self.mode = config.get("email_mode", "llm")
+        self.tone = config.get("email_tone", "formal")
+        self.personalize = config.get("email_personalize", False)
+        self.personalize_model = (
+            load_model(config, registry, config.get("email_personalize_model", "gemini-2.5-flash"))
+            if self.mode == "template" and self.personalize
+            else None
+        )
+        cache_dir = config.get("cache_dir", ".cache")
+        self.template_cache = (
+            get_cache(os.path.join(cache_dir, "email_templates.sqlite"), max_entries=1000)
+            if cache_dir
+            else None
+        )
+        self.template_version = ResultCache.make_key(self._build_template_prompt("", "", ""))
+        self._templates = {}
+        self._template_locks = {}
+        self._lock = threading.Lock()
 
-    def _build_prompt(self, candidate: dict, jd: dict, ranking: dict) -> str:
+    def _build_prompt(self, candidate: dict, jd: dict, ranking: dict):
+        """
+        Returns (prompt, tokens saved by the compact encoding).
+        """
         decision = "invite" if ranking["score"] >= 75 else "rejection"
+        candidate_payload = self.encoder.encode(candidate, CANDIDATE_FIELDS)
 
-        return f"""
+        prompt = f"""
 You are an assistant generating professional emails for recruiters.
 
 Create an email for a candidate based on this data:
 
 CANDIDATE:
-{json.dumps(candidate, indent=2)}
+{candidate_payload.text}
 
 JOB ROLE:
 {jd.get('role', 'N/A')}
@@ -41,17 +98,134 @@ Guidelines:
   "type": "{decision}"
 }}
 """
+        return prompt, candidate_payload.tokens_saved
 
-    def generate(self, candidate: dict, jd: dict, ranking: dict) -> EmailResult:
-        prompt = self._build_prompt(candidate, jd, ranking)
+    def _build_template_prompt(self, role: str, decision: str, tone: str) -> str:
+        return f"""
+You are an assistant writing reusable email templates for recruiters.
 
-        response = self.model.generate_content(prompt)
-        text = response.text.strip()
+Write one {decision} email template for candidates who applied for the role below.
+
+JOB ROLE:
+{role}
+
+DECISION: {decision}
+
+Guidelines:
+- If decision is "invite", write a polite interview invitation email.
+- If decision is "rejection", write a polite rejection email.
+- Keep tone {tone} and concise.
+- Use these placeholders exactly as written, and no others:
+  {{candidate_name}} for the candidate's name, {{role}} for the job role, and
+  {{personal_line}} on its own paragraph for one optional personalized sentence.
+- Output JSON ONLY in this format:
 
+{{
+  "subject": "...",
+  "body": "..."
+}}
+"""
+
+    def _template(self, role: str, decision: str) -> EmailTemplate:
+        """
+        Returns the template for (role, decision, tone), generating it at most once
+        per process and reusing it across runs through the on-disk cache.
+        """
+        key = ResultCache.make_key(
+            " ".join(role.lower().split()), decision, self.tone, self.template_version,
+            self.model_name, getattr(self.fast_model, "model_name", None),
+        )
+        with self._lock:
+            if key in self._templates:
+                return self._templates[key]
+            lock = self._template_locks.setdefault(key, threading.Lock())
+
+        # Concurrent candidates with the same key wait for a single generation
+        with lock:
+            if key in self._templates:
+                return self._templates[key]
+            cached = self.template_cache.get(key) if self.template_cache else None
+            template = None
+            if cached is not None:
+                try:
+                    template = _check_template(EmailTemplate.model_validate_json(cached))
+                except ValueError:
+                    # Stored before unknown slots were rejected; generate a fresh one
+                    pass
+            if template is None:
+                print(f"[EmailGenerator] Generating {decision} template for {role}")
+                template = self.llm.cascade(
+                    self.fast_model, self.model, self._build_template_prompt(role, decision, self.tone),
+                    agent="EmailGenerator", parse=_parse_template,
+                )
+                if self.template_cache:
+                    self.template_cache.set(key, template.model_dump_json())
+            with self._lock:
+                self._templates[key] = template
+            return template
+
+    def _personal_line(self, candidate: dict, role: str, ranking: dict, decision: str) -> str:
+        """
+        One short personalized sentence from the small model, or "" if it fails.
+        """
+        background = self.encoder.encode(candidate, PERSONALIZE_FIELDS)
+        prompt = f"""
+You are an assistant personalizing a recruiter email.
+
+Write ONE short, specific sentence (at most 30 words) for a {decision} email to a
+candidate for the {role} role, referring to their background below. No greeting or sign-off.
+
+BACKGROUND:
+{background.text}
+
+EVALUATION:
+{ranking.get('summary', '')}
+
+Return ONLY JSON: {{"sentence": "..."}}
+"""
         try:
-            data = json.loads(text)
-        except Exception:
-            clean_text = text[text.find("{"): text.rfind("}") + 1]
-            data = json.loads(clean_text)
+            return self.llm.call(
+                self.personalize_model, prompt, agent="EmailPersonalizer",
+                tokens_saved=background.tokens_saved,
+                parse=lambda text: str(extract_json(text)["sentence"]).strip(),
+            )
+        except Exception as e:
+            print(f"[EmailGenerator] Personalization skipped: {e}")
+            return ""
+
+    def _render(self, candidate: dict, jd: dict, ranking: dict) -> EmailResult:
+        decision = "invite" if ranking["score"] >= 75 else "rejection"
+        role = jd.get("role", "N/A")
+        template = self._template(role, decision)
+
+        personal_line = (
+            self._personal_line(candidate, role, ranking, decision) if self.personalize_model else ""
+        )
+        slots = {
+            "candidate_name": candidate.get("name") or "Candidate",
+            "role": role,
+            "personal_line": personal_line,
+        }
+        subject, body = template.subject, template.body
+        if not personal_line:
+            body = body.replace("{personal_line}\n\n", "").replace("{personal_line}", "")
+        for name, value in slots.items():
+            subject = subject.replace("{" + name + "}", value)
+            body = body.replace("{" + name + "}", value)
+        return EmailResult(subject=subject, body=body.strip(), type=decision)
+
+    def generate(self, candidate: dict, jd: dict, ranking: dict) -> EmailResult:
+        """
+        email_mode="llm" (default): one LLM call per candidate.
+        email_mode="template": rendered locally from a cached (role, decision, tone)
+        template, plus an optional small-model sentence when email_personalize is on.
+        """
+        if self.mode == "template":
+            return self._render(candidate, jd, ranking)
+
+        prompt, tokens_saved = self._build_prompt(candidate, jd, ranking)
 
-        return EmailResult(**data)
+        return self.llm.cascade(
+            self.fast_model, self.model, prompt, agent="EmailGenerator", tokens_saved=tokens_saved,
+            parse=lambda text: EmailResult(**extract_json(text)),
+        )
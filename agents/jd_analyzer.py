@@ -1,6 +1,11 @@
-import json
-import google.generativeai as genai
 from pydantic import BaseModel
+from tools.llm_client import LLMExecutor, extract_json, load_fast_model, load_model
+
+def normalize_jd_text(jd_text: str) -> str:
+    """
+    Collapses whitespace and case so trivially reformatted JDs share a cache entry.
+    """
+    return " ".join(jd_text.split()).lower()
 
 class JDAnalysisResult(BaseModel):
     role: str
@@ -10,13 +15,15 @@ class JDAnalysisResult(BaseModel):
     soft_skills: list
 
 class JDAnalyzer:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, registry=None):
         """
-        Initialize JD Analyzer with Gemini Pro configuration.
+        Initialize JD Analyzer with the configured Gemini model (jd_model).
+        Pass a ClientRegistry to reuse its shared model client.
         """
-        genai.configure(api_key=config["gemini_key"])
-        
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        self.model_name = config.get("jd_model", 'gemini-2.5-pro')
+        self.model = load_model(config, registry, self.model_name)
+        self.fast_model = load_fast_model(config, registry, self.model_name)
+        self.llm = LLMExecutor(config)
 
     def _build_prompt(self, jd_text: str) -> str:
         return f"""
@@ -49,16 +56,8 @@ JOB DESCRIPTION:
         """
         prompt = self._build_prompt(jd_text)
 
-        # Generate content using the Gemini 2.5 Pro model
-        response = self.model.generate_content(prompt)
-        text = response.text.strip()
-
-        # Parse the JSON output
-        try:
-            data = json.loads(text)
-        except Exception:
-            # Fallback if model returns extra explanation
-            clean_text = text[text.find("{"): text.rfind("}") + 1]
-            data = json.loads(clean_text)
-
-        return JDAnalysisResult(**data)
+        # Malformed JSON is retried, or escalated to the main model in cascade mode
+        return self.llm.cascade(
+            self.fast_model, self.model, prompt, agent="JDAnalyzer",
+            parse=lambda text: JDAnalysisResult(**extract_json(text)),
+        )
@@ -1,13 +1,24 @@
+from concurrent.futures import Future
 from tools.slack_notifier import SlackNotifier, SlackResult
+from tools.slack_dispatcher import get_dispatcher
 
 class NotifierAgent:
-    def __init__(self, config: dict):
-        self.notifier = SlackNotifier(
-            token=config.get("slack_token"),
-            channel="#hiring"
+    def __init__(self, config: dict, registry=None):
+        if registry is not None:
+            self.notifier = registry.slack_notifier("#hiring")
+        else:
+            self.notifier = SlackNotifier(
+                token=config.get("slack_token"),
+                channel="#hiring"
+            )
+        self.dispatcher = get_dispatcher(
+            self.notifier,
+            rate_per_second=config.get("slack_rate_per_second", 1.0),
+            burst=config.get("slack_burst", 3),
         )
+        self.digest_size = config.get("slack_digest_size", 20)
 
-    def send_notification(self, candidate: dict, ranking: dict, email: dict, calendar: dict) -> SlackResult:
+    def _build_message(self, candidate: dict, ranking: dict, email: dict, calendar: dict) -> str:
         decision = "Invite" if ranking["score"] >= 75 else "Rejection"
 
         message = f"""
@@ -23,4 +34,50 @@ Email Prepared: {email['subject']}
         if calendar.get("calendar_event"):
             message += f"\nCalendar Event: {calendar['calendar_event']}"
 
+        return message
+
+    def send_notification(self, candidate: dict, ranking: dict, email: dict, calendar: dict) -> SlackResult:
+        message = self._build_message(candidate, ranking, email, calendar)
         return self.notifier.send_message(message)
+
+    def queue_notification(self, candidate: dict, ranking: dict, email: dict, calendar: dict) -> Future:
+        """
+        Queues the update on the background dispatcher; the Future resolves to a SlackResult.
+        """
+        message = self._build_message(candidate, ranking, email, calendar)
+        return self.dispatcher.submit(message)
+
+    def queue_digest(self, updates: list) -> list:
+        """
+        Folds many (candidate, ranking, email, calendar) updates into a few
+        block kit messages of up to digest_size candidates each.
+        Returns one Future per update, resolving when its digest message is delivered.
+        """
+        futures = []
+        for offset in range(0, len(updates), self.digest_size):
+            chunk = updates[offset: offset + self.digest_size]
+            messages = [self._build_message(*update) for update in chunk]
+            names = ", ".join(candidate.get("name", "Unknown") for candidate, *_ in chunk)
+
+            blocks = [{
+                "type": "header",
+                "text": {"type": "plain_text", "text": f"Candidate digest ({len(chunk)} updates)"},
+            }]
+            for message in messages:
+                blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": message.strip()[:3000]}})
+                blocks.append({"type": "divider"})
+
+            delivery = self.dispatcher.submit(f"Candidate digest: {names}", blocks)
+            for message in messages:
+                futures.append(self._per_candidate(delivery, message))
+        return futures
+
+    @staticmethod
+    def _per_candidate(delivery: Future, message: str) -> Future:
+        future = Future()
+        delivery.add_done_callback(
+            lambda done: future.set_result(
+                SlackResult(status=done.result().status, channel=done.result().channel, message=message)
+            )
+        )
+        return future
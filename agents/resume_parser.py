@@ -1,9 +1,9 @@
-import json
-import pdfplumber
-import google.generativeai as genai
 from pydantic import BaseModel
+from tools.llm_client import LLMExecutor, extract_json, load_fast_model, load_model
 import os
 from typing import List, Dict
+from tools.result_cache import ResultCache, get_cache
+from tools.pdf_extractor import PdfExtractor, PdfSource, describe_source, read_pdf_bytes
 
 class ResumeParseResult(BaseModel):
     name: str
@@ -15,16 +15,54 @@ class ResumeParseResult(BaseModel):
     projects: List[Dict]
 
 class ResumeParser:
-    def __init__(self, config: dict):
-        genai.configure(api_key=config["gemini_key"])
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+    def __init__(self, config: dict, registry=None):
+        self.model_name = config.get("resume_model", 'gemini-2.5-pro')
+        self.model = load_model(config, registry, self.model_name)
+        self.fast_model = load_fast_model(config, registry, self.model_name)
+        self.llm = LLMExecutor(config)
+        self.extractor = PdfExtractor(config)
 
-    def _extract_pdf_text(self, pdf_path: str) -> str:
-        text_content = []
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text_content.append(page.extract_text() or "")
-        return "\n".join(text_content)
+        # Parsed resumes are cached on disk, keyed by PDF content + prompt + model
+        cache_dir = config.get("cache_dir", ".cache")
+        self.cache = (
+            get_cache(
+                os.path.join(cache_dir, "resume_parse.sqlite"),
+                max_entries=config.get("resume_cache_entries", 5000),
+            )
+            if cache_dir
+            else None
+        )
+        # Extracted text, keyed by PDF content alone, so the duplicate check can
+        # fingerprint a re-uploaded resume without extracting it again. Without a
+        # cache_dir it lives in memory, so the parse still reuses the check's extraction.
+        self.text_cache = get_cache(
+            os.path.join(cache_dir, "resume_text.sqlite") if cache_dir else ":memory:",
+            max_entries=config.get("resume_cache_entries", 5000),
+        )
+        self.prompt_version = ResultCache.make_key(self._build_prompt(""))
+
+    def _extract_pdf_text(self, source: PdfSource, pdf_bytes: bytes = None) -> str:
+        result = self.extractor.extract(pdf_bytes if pdf_bytes is not None else source)
+        print(
+            f"[ResumeParser] Extracted {result.pages} page(s) from {describe_source(source)} "
+            f"in {result.seconds:.2f}s ({result.engine})"
+        )
+        return result.text
+
+    def extract_text(self, source: PdfSource, pdf_bytes: bytes = None) -> str:
+        """
+        The resume's extracted text; PDFs seen before are served from the text cache.
+        """
+        if pdf_bytes is None:
+            pdf_bytes = read_pdf_bytes(source)
+        key = ResultCache.make_key(pdf_bytes)
+        cached = self.text_cache.get(key)
+        if cached is not None:
+            return cached
+
+        text = self._extract_pdf_text(source, pdf_bytes)
+        self.text_cache.set(key, text)
+        return text
 
     def _build_prompt(self, text: str) -> str:
         return f"""
@@ -58,19 +96,36 @@ RESUME TEXT:
 {text}
 """
 
-    def parse(self, pdf_path: str) -> ResumeParseResult:
-        resume_text = self._extract_pdf_text(pdf_path)
-        prompt = self._build_prompt(resume_text)
+    def parse(self, source: PdfSource) -> ResumeParseResult:
+        """
+        Parses a resume given as a file path or as in-memory bytes, memoryview or
+        file-like buffer (e.g. a Streamlit upload).
+        """
+        if self.cache is None:
+            return self._parse_uncached(source)
+
+        # Read once: the same bytes key the cache and feed the extractor
+        pdf_bytes = read_pdf_bytes(source)
+        key = ResultCache.make_key(
+            pdf_bytes, self.prompt_version, self.model_name,
+            getattr(self.fast_model, "model_name", None),
+        )
 
-        response = self.model.generate_content(prompt)
-        text = response.text.strip()
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"[ResumeParser] Cache hit for {describe_source(source)}")
+            return ResumeParseResult.model_validate_json(cached)
 
-        try:
-            data = json.loads(text)
-        except Exception:
-            clean_text = text[text.find("{"): text.rfind("}") + 1]
-            data = json.loads(clean_text)
+        result = self._parse_uncached(source, pdf_bytes)
+        self.cache.set(key, result.model_dump_json())
+        return result
 
-        return ResumeParseResult(**data)
-    
+    def _parse_uncached(self, source: PdfSource, pdf_bytes: bytes = None) -> ResumeParseResult:
+        # Served from the text cache when the duplicate check already extracted it
+        resume_text = self.extract_text(source, pdf_bytes)
+        prompt = self._build_prompt(resume_text)
 
+        return self.llm.cascade(
+            self.fast_model, self.model, prompt, agent="ResumeParser",
+            parse=lambda text: ResumeParseResult(**extract_json(text)),
+        )
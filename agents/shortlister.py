@@ -0,0 +1,95 @@
+import re
+import zlib
+import numpy as np
+from pydantic import BaseModel
+from typing import List
+
+class ShortlistResult(BaseModel):
+    selected: List[int]
+    similarities: List[float]
+    # Per resume: "" if selected, else why it was left out ("threshold" or "top_k")
+    exclusions: List[str] = []
+
+class Shortlister:
+    """
+    Cheap local pre-filter that runs before the LLM ranker.
+    Embeds the JD and every resume with a hashed TF-IDF vectorizer and scores
+    them all with a single matrix product; no model or network call is made.
+    """
+
+    def __init__(self, config: dict):
+        self.dims = config.get("shortlist_dims", 4096)
+        self.top_k = config.get("shortlist_top_k", 50)
+        self.threshold = config.get("shortlist_threshold", 0.0)
+
+    def _document(self, data) -> str:
+        """
+        Flattens a parsed JD/resume dict into plain text, dropping the keys.
+        """
+        if isinstance(data, dict):
+            return " ".join(self._document(value) for value in data.values())
+        if isinstance(data, (list, tuple)):
+            return " ".join(self._document(value) for value in data)
+        return str(data)
+
+    def _vectorize(self, documents: List[str]) -> np.ndarray:
+        counts = np.zeros((len(documents), self.dims), dtype=np.float32)
+        for row, document in enumerate(documents):
+            for token in re.findall(r"[a-z0-9][a-z0-9+#.]*", document.lower()):
+                # crc32 is stable across processes, unlike the built-in hash()
+                counts[row, zlib.crc32(token.encode("utf-8")) % self.dims] += 1
+
+        tf = np.log1p(counts)
+        df = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(documents)) / (1 + df)) + 1
+        vectors = tf * idf
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def shortlist(self, jd: dict, resumes: List[dict]) -> ShortlistResult:
+        if not resumes:
+            return ShortlistResult(selected=[], similarities=[], exclusions=[])
+
+        vectors = self._vectorize([self._document(jd)] + [self._document(r) for r in resumes])
+        similarities = vectors[1:] @ vectors[0]
+
+        order = [int(i) for i in np.argsort(-similarities, kind="stable")]
+        passed = [i for i in order if similarities[i] >= self.threshold]
+        selected = passed[: self.top_k] if self.top_k is not None else passed
+
+        exclusions = ["threshold"] * len(resumes)
+        for i in passed:
+            exclusions[i] = "top_k"
+        for i in selected:
+            exclusions[i] = ""
+
+        return ShortlistResult(
+            selected=sorted(selected),
+            similarities=[round(float(s), 4) for s in similarities],
+            exclusions=exclusions,
+        )
+
+    def exclusion_summary(self, exclusion: str, similarity: float) -> str:
+        """
+        Ranking summary for a resume that was not shortlisted, naming the cut it missed.
+        """
+        if exclusion == "top_k":
+            return (
+                "Not shortlisted for detailed review: the resume's similarity to the "
+                f"job description ({similarity:.2f}) ranked outside the top {self.top_k} in this batch."
+            )
+        return (
+            "Not shortlisted for detailed review: the resume's similarity to the "
+            f"job description ({similarity:.2f}) was below the shortlist threshold "
+            f"({self.threshold:.2f})."
+        )
+
+    @staticmethod
+    def fallback_score(similarity: float) -> int:
+        """
+        Deterministic low score for candidates that are not sent to the LLM.
+        Capped well below the 75 invite cutoff.
+        """
+        return int(round(max(similarity, 0.0) * 40))
@@ -0,0 +1,198 @@
+import datetime
+import json
+import re
+import numpy as np
+from typing import List
+from agents.candidate_ranker import CandidateScoreResult
+
+# Canonical skill -> aliases seen in JDs and resumes. Matching is done on canonical names.
+SKILL_SYNONYMS = {
+    "python": ["python3", "py"],
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": ["ts"],
+    "java": ["java8", "java 8", "java 11", "java 17"],
+    "c++": ["cpp", "c plus plus"],
+    "c#": ["csharp", "c sharp"],
+    "go": ["golang"],
+    "node.js": ["node", "nodejs", "node js"],
+    "react": ["react.js", "reactjs", "react js"],
+    "angular": ["angularjs", "angular.js"],
+    "vue": ["vue.js", "vuejs"],
+    "sql": ["structured query language"],
+    "postgresql": ["postgres", "psql"],
+    "mysql": ["my sql"],
+    "mongodb": ["mongo"],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "natural language processing": ["nlp"],
+    "computer vision": ["cv"],
+    "large language models": ["llm", "llms"],
+    "artificial intelligence": ["ai"],
+    "tensorflow": ["tf"],
+    "pytorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "kubernetes": ["k8s", "kube"],
+    "amazon web services": ["aws"],
+    "google cloud platform": ["gcp", "google cloud"],
+    "microsoft azure": ["azure"],
+    "ci/cd": ["cicd", "ci cd", "continuous integration", "continuous delivery"],
+    "rest api": ["rest", "restful", "rest apis", "restful apis"],
+}
+
+_ALIASES = {
+    alias: canonical
+    for canonical, aliases in SKILL_SYNONYMS.items()
+    for alias in [canonical] + aliases
+}
+
+# Skill names that are also everyday words ("go", "rest") only count when listed as skills
+_COMMON_WORDS = {"go", "rest", "node", "react", "torch", "spring", "express", "swift"}
+
+def _mention_terms(skill: str) -> List[str]:
+    """
+    Terms that count as a mention of `skill` in free text: the canonical name and
+    its aliases, minus short abbreviations ("ai", "cv", "ts") and everyday words.
+    """
+    return [
+        term for term in [skill] + SKILL_SYNONYMS.get(skill, [])
+        if len(term) > 2 and term not in _COMMON_WORDS
+    ]
+
+def canonicalize_skill(skill: str) -> str:
+    """
+    Lower-cases, trims and maps a skill to its canonical name.
+    """
+    normalized = re.sub(r"\s+", " ", str(skill).strip().lower())
+    return _ALIASES.get(normalized, normalized)
+
+def estimate_experience_years(experience: list) -> float:
+    """
+    Sums the durations of parsed experience entries.
+    Understands "2 years 6 months", "18 months" and "2019 - 2022" / "Jan 2020 - Present".
+    """
+    current_year = datetime.date.today().year
+    total = 0.0
+    for entry in experience or []:
+        duration = str(entry.get("duration", "") if isinstance(entry, dict) else entry).lower()
+
+        years = re.search(r"(\d+(?:\.\d+)?)\s*(?:years?|yrs?)", duration)
+        months = re.search(r"(\d+)\s*(?:months?|mos?)\b", duration)
+        if years or months:
+            total += float(years.group(1)) if years else 0.0
+            total += int(months.group(1)) / 12 if months else 0.0
+            continue
+
+        found = [int(y) for y in re.findall(r"\b((?:19|20)\d{2})\b", duration)]
+        if re.search(r"present|current|now|till date", duration):
+            found.append(current_year)
+        if len(found) >= 2:
+            total += max(0, max(found) - min(found))
+    return round(total, 1)
+
+class SkillMatcher:
+    """
+    Deterministic, LLM-free scorer.
+    Builds a candidates x skills incidence matrix over the canonical JD vocabulary
+    and computes coverage, weighted overlap and experience gap for the whole batch at once.
+    """
+
+    def __init__(self, config: dict):
+        self.skill_weight = config.get("skill_weight", 1.0)
+        self.tool_weight = config.get("tool_weight", 0.6)
+        self.mention_credit = config.get("skill_mention_credit", 0.5)
+
+    def _vocabulary(self, jd: dict):
+        vocabulary, weights, required = [], [], []
+        for skills, weight, is_required in (
+            (jd.get("skills", []), self.skill_weight, True),
+            (jd.get("tools", []), self.tool_weight, False),
+        ):
+            for skill in skills:
+                canonical = canonicalize_skill(skill)
+                if canonical and canonical not in vocabulary:
+                    vocabulary.append(canonical)
+                    weights.append(weight)
+                    required.append(is_required)
+        return vocabulary, np.array(weights, dtype=np.float32), np.array(required, dtype=bool)
+
+    def _incidence(self, vocabulary: List[str], resumes: List[dict]) -> np.ndarray:
+        """
+        1.0 when the skill is listed on the resume, mention_credit when it only
+        appears in the resume's other text (projects, experience), else 0.
+        """
+        matrix = np.zeros((len(resumes), len(vocabulary)), dtype=np.float32)
+        for row, resume in enumerate(resumes):
+            listed = {canonicalize_skill(s) for s in resume.get("skills", [])}
+            text = json.dumps(
+                {k: v for k, v in resume.items() if k != "skills"}
+            ).lower()
+            for col, skill in enumerate(vocabulary):
+                if skill in listed:
+                    matrix[row, col] = 1.0
+                elif any(
+                    re.search(rf"(?<![a-z0-9]){re.escape(term)}(?![a-z0-9])", text)
+                    for term in _mention_terms(skill)
+                ):
+                    matrix[row, col] = self.mention_credit
+        return matrix
+
+    def features(self, jd: dict, resumes: List[dict]) -> dict:
+        vocabulary, weights, required = self._vocabulary(jd)
+        matrix = self._incidence(vocabulary, resumes)
+
+        # A JD without skills or tools gives no evidence of a match, so no skill credit
+        if vocabulary:
+            weighted_overlap = matrix @ weights / weights.sum()
+        else:
+            weighted_overlap = np.zeros(len(resumes), dtype=np.float32)
+        if required.any():
+            coverage = (matrix[:, required] >= 1.0).mean(axis=1)
+        else:
+            coverage = weighted_overlap
+
+        required_years = float(jd.get("experience_years", 0) or 0)
+        years = np.array(
+            [estimate_experience_years(r.get("experience", [])) for r in resumes],
+            dtype=np.float32,
+        )
+        experience_gap = np.clip(required_years - years, 0, None) / max(required_years, 1.0)
+
+        return {
+            "vocabulary": vocabulary,
+            "matrix": matrix,
+            "coverage": coverage,
+            "weighted_overlap": weighted_overlap,
+            "experience_years": years,
+            "experience_gap": np.clip(experience_gap, 0, 1),
+        }
+
+    def score_batch(self, jd: dict, resumes: List[dict]) -> List[CandidateScoreResult]:
+        if not resumes:
+            return []
+
+        f = self.features(jd, resumes)
+        scores = 100 * (
+            0.45 * f["coverage"]
+            + 0.35 * f["weighted_overlap"]
+            + 0.20 * (1 - f["experience_gap"])
+        )
+
+        results = []
+        required_years = jd.get("experience_years", 0)
+        for row, score in enumerate(scores):
+            matched = [s for s, v in zip(f["vocabulary"], f["matrix"][row]) if v >= 1.0]
+            missing = [s for s, v in zip(f["vocabulary"], f["matrix"][row]) if v == 0]
+            skills = (
+                f"{len(matched)} of {len(f['vocabulary'])} JD skills/tools "
+                f"listed ({', '.join(matched) or 'none'}). "
+                f"Missing: {', '.join(missing) or 'none'}. "
+                if f["vocabulary"]
+                else "the job description lists no skills or tools to match. "
+            )
+            summary = (
+                f"Heuristic skill match: {skills}"
+                f"Estimated experience {f['experience_years'][row]:.1f} years "
+                f"against {required_years} required."
+            )
+            results.append(CandidateScoreResult(score=int(round(float(score))), summary=summary))
+        return results
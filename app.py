@@ -1,6 +1,4 @@
 import os
-import tempfile
-import time
 import streamlit as st
 from dotenv import load_dotenv
 from orchestrator.graph.graph_builder import create_graph
@@ -15,8 +13,53 @@ def load_config():
         "google_api_key": os.getenv("GOOGLE_API_KEY"),
         "slack_token": os.getenv("SLACK_BOT_TOKEN"),
         "llm_provider": "gemini",
+        "parse_concurrency": int(os.getenv("PARSE_CONCURRENCY", "4")),
+        "cache_dir": os.getenv("CACHE_DIR", ".cache"),
+        "shortlist_top_k": int(os.getenv("SHORTLIST_TOP_K", "50")),
+        "ranking_mode": os.getenv("RANKING_MODE", "llm"),
+        # Fan-out lets candidate cards render as each candidate finishes
+        "graph_mode": os.getenv("GRAPH_MODE", "fanout"),
+        "candidate_concurrency": int(os.getenv("CANDIDATE_CONCURRENCY", "8")),
+        "pdf_workers": int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1))),
+        "slack_digest": os.getenv("SLACK_DIGEST", "false").lower() == "true",
+        "slack_background": os.getenv("SLACK_BACKGROUND", "false").lower() == "true",
+        "trace_path": os.getenv("TRACE_PATH"),
+        "metrics_port": int(os.getenv("METRICS_PORT") or "0") or None,
+        "metrics_host": os.getenv("METRICS_HOST", "127.0.0.1"),
+        # Not checkpointed: runs are never resumed, and the state holds the uploaded PDF bytes
+        "checkpoint_path": None,
+        "prompt_encoding": os.getenv("PROMPT_ENCODING", "compact"),
+        "prompt_field_token_budget": int(os.getenv("PROMPT_FIELD_TOKEN_BUDGET", "60")),
+        "llm_timeout": float(os.getenv("LLM_TIMEOUT", "120")),
+        "llm_max_retries": int(os.getenv("LLM_MAX_RETRIES", "3")),
+        "llm_hedge": os.getenv("LLM_HEDGE", "true").lower() == "true",
+        "jd_model": os.getenv("JD_MODEL", "gemini-2.5-pro"),
+        "resume_model": os.getenv("RESUME_MODEL", "gemini-2.5-pro"),
+        "ranker_model": os.getenv("RANKER_MODEL", "gemini-2.5-pro"),
+        "email_model": os.getenv("EMAIL_MODEL", "gemini-2.5-pro"),
+        "model_cascade": os.getenv("MODEL_CASCADE", "false").lower() == "true",
+        "cascade_fast_model": os.getenv("CASCADE_FAST_MODEL", "gemini-2.5-flash"),
+        "cascade_borderline_band": int(os.getenv("CASCADE_BORDERLINE_BAND", "10")),
+        "llm_rpm": int(os.getenv("LLM_RPM", "150")),
+        "llm_tpm": int(os.getenv("LLM_TPM", "2000000")),
+        "run_priority": "interactive",
+        "email_mode": os.getenv("EMAIL_MODE", "llm"),
+        "email_tone": os.getenv("EMAIL_TONE", "formal"),
+        "email_personalize": os.getenv("EMAIL_PERSONALIZE", "false").lower() == "true",
+        "candidate_store_path": os.getenv("CANDIDATE_STORE_PATH", ".cache/candidates.sqlite"),
+        "dedup": os.getenv("DEDUP", "true").lower() == "true",
+        "dedup_threshold": float(os.getenv("DEDUP_THRESHOLD", "0.8")),
+        "dedup_action": os.getenv("DEDUP_ACTION", "merge"),
     }
 
+@st.cache_resource
+def get_graph():
+    """
+    Builds the graph (and its shared client registry) once per server process
+    and reuses it across reruns and sessions.
+    """
+    return create_graph(load_config())
+
 # --- Streamlit page setup ---
 st.set_page_config(
     page_title="Hiring Copilot",
@@ -49,9 +92,47 @@ uploaded_files = st.file_uploader(
 
 run_button = st.button("🚀 Run Pipeline")
 
-def show_stage(status_placeholder, stage_text, delay=0.8):
-    status_placeholder.info(stage_text)
-    time.sleep(delay)
+STAGE_MESSAGES = {
+    "jd_analyzer": "Job description analyzed. Processing resumes...",
+    "resume_parser": "Resumes parsed. Shortlisting candidates...",
+    "shortlist": "Shortlist ready. Ranking candidates...",
+    "candidate_ranker": "Candidates ranked. Generating emails...",
+    "email_generator": "Emails generated. Scheduling interviews...",
+    "calendar": "Interviews scheduled. Posting Slack updates...",
+}
+
+def render_jd(jd_result):
+    st.subheader("Parsed Job Description")
+    st.write(f"**Role:** {jd_result.get('role', 'N/A')}")
+    st.write(f"**Skills:** {', '.join(jd_result.get('skills', []))}")
+    st.write(f"**Tools:** {', '.join(jd_result.get('tools', []))}")
+    st.write(f"**Experience (years):** {jd_result.get('experience_years', 'N/A')}")
+    st.write(f"**Soft Skills:** {', '.join(jd_result.get('soft_skills', []))}")
+
+def render_candidate(idx, resume, ranking, email, calendar, slack):
+    st.divider()
+    st.markdown(f"### Candidate {idx+1}: {resume.get('name', 'Unknown')}")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("**Ranking:**")
+        st.write(f"Score: {ranking['score']}")
+        st.write(ranking['summary'])
+
+    with col2:
+        st.markdown("**Generated Email:**")
+        st.write(f"Subject: {email['subject']}")
+        st.text_area("Email Body", email["body"], height=180, key=f"email_{idx}")
+
+    if ranking['score'] >= 75 and "calendar_event" in calendar:
+        st.markdown(f"**Calendar Event:** {calendar['calendar_event']}")
+    else:
+        st.markdown("**Calendar Event:** Not scheduled")
+
+    st.markdown("**Slack Notification:**")
+    st.write(f"Status: {slack['status']}")
+    st.write(f"Channel: {slack['channel']}")
 
 if run_button:
     if not jd_text.strip():
@@ -61,80 +142,58 @@ if run_button:
     else:
         # Placeholder for progress messages
         status_placeholder = st.empty()
+        status_placeholder.info("Analyzing job description...")
+        graph = get_graph()
 
-        # Stage 1: Setup
-        show_stage(status_placeholder, "Setting up pipeline...")
-        config = load_config()
-        graph = create_graph(config)
-
-        # Stage 2: Saving uploaded files
-        show_stage(status_placeholder, "Preparing resumes...")
-        resume_paths = []
-        for file in uploaded_files:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            temp_file.write(file.read())
-            temp_file.flush()
-            resume_paths.append(temp_file.name)
+        # Uploads go through the graph as in-memory PDF bytes; nothing is written to disk
+        resume_sources = [file.getvalue() for file in uploaded_files]
 
-        # Stage 3: Parsing JD
-        show_stage(status_placeholder, "Parsing job description...")
-
-        # Stage 4: Parsing resumes
-        show_stage(status_placeholder, "Analyzing resumes...")
-
-        # Stage 5: Ranking candidates
-        show_stage(status_placeholder, "Ranking candidates and generating results...")
-
-        # Stage 6: Running the graph
-        final_state = graph.invoke({
-            "jd_text": jd_text,
-            "resume_paths": resume_paths
-        })
-
-        status_placeholder.success("All stages completed!")
-
-        # --- Display Results ---
         st.header("Results")
-
-        # JD Parsed
-        jd_result = final_state.get("jd_result", {})
-        st.subheader("Parsed Job Description")
-        st.write(f"**Role:** {jd_result.get('role', 'N/A')}")
-        st.write(f"**Skills:** {', '.join(jd_result.get('skills', []))}")
-        st.write(f"**Tools:** {', '.join(jd_result.get('tools', []))}")
-        st.write(f"**Experience (years):** {jd_result.get('experience_years', 'N/A')}")
-        st.write(f"**Soft Skills:** {', '.join(jd_result.get('soft_skills', []))}")
-
-        # Candidates
+        jd_container = st.container()
         st.subheader("Candidate Results")
-        for idx, resume in enumerate(final_state.get("resume_results", [])):
-            st.divider()
-            st.markdown(f"### Candidate {idx+1}: {resume.get('name', 'Unknown')}")
-
-            ranking = final_state["rankings"][idx]
-            email = final_state["emails"][idx]
-            calendar = final_state["calendars"][idx]
-            slack = final_state["slacks"][idx]
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.markdown("**Ranking:**")
-                st.write(f"Score: {ranking['score']}")
-                st.write(ranking['summary'])
-
-            with col2:
-                st.markdown("**Generated Email:**")
-                st.write(f"Subject: {email['subject']}")
-                st.text_area("Email Body", email["body"], height=180, key=f"email_{idx}")
-
-            if ranking['score'] >= 75 and "calendar_event" in calendar:
-                st.markdown(f"**Calendar Event:** {calendar['calendar_event']}")
-            else:
-                st.markdown("**Calendar Event:** Not scheduled")
-
-            st.markdown("**Slack Notification:**")
-            st.write(f"Status: {slack['status']}")
-            st.write(f"Channel: {slack['channel']}")
+        rendered = 0
+
+        # Each streamed update is one finished node (or one finished candidate branch)
+        for update in graph.stream(
+            {"jd_text": jd_text, "resume_paths": resume_sources},
+            stream_mode="updates",
+        ):
+            for node, output in update.items():
+                if node == "jd_analyzer":
+                    with jd_container:
+                        render_jd(output.get("jd_result", {}))
+
+                if node == "candidate":
+                    for record in output["candidates"]:
+                        if record.get("error"):
+                            st.warning(
+                                f"Could not process {uploaded_files[record['index']].name}: {record['error']['error']}"
+                            )
+                        elif record.get("duplicate"):
+                            st.info(
+                                f"{uploaded_files[record['index']].name} duplicates an earlier resume"
+                                f" ({record['duplicate']['reason']}); skipped."
+                            )
+                        else:
+                            render_candidate(
+                                record["index"], record["resume"], record["ranking"],
+                                record["email"], record["calendar"], record["slack"],
+                            )
+                        rendered += 1
+                    status_placeholder.info(
+                        f"Processed {rendered} of {len(resume_sources)} candidates..."
+                    )
+                elif node == "slack_notifier":
+                    # Staged graph: every candidate completes at once
+                    for idx, resume in enumerate(output.get("resume_results", [])):
+                        render_candidate(
+                            idx, resume, output["rankings"][idx], output["emails"][idx],
+                            output["calendars"][idx], output["slacks"][idx],
+                        )
+                    for duplicate in output.get("duplicates", []):
+                        st.info(f"Skipped a duplicate resume ({duplicate['reason']}).")
+                elif node in STAGE_MESSAGES:
+                    status_placeholder.info(STAGE_MESSAGES[node])
 
+        status_placeholder.success("All stages completed!")
         st.info("Check Slack and Google Calendar for notifications and events.")
@@ -0,0 +1,62 @@
+import os
+import random
+import pymupdf
+
+FIRST_NAMES = ["Asha", "Rahul", "Meera", "Vikram", "Priya", "Arjun", "Neha", "Kiran", "Sara", "Dev"]
+LAST_NAMES = ["Sharma", "Iyer", "Patel", "Khan", "Reddy", "Das", "Nair", "Gupta", "Rao", "Singh"]
+SKILLS = [
+    "Python", "Kubernetes", "SQL", "Docker", "AWS", "Java", "React", "Go",
+    "PostgreSQL", "Terraform", "Kafka", "Spark", "TensorFlow", "REST API", "Git",
+]
+
+SAMPLE_JD = """
+We are hiring a Backend Engineer to build and operate our hiring platform APIs.
+You will design REST APIs in Python, run services on Kubernetes and Docker in AWS,
+and model data in SQL/PostgreSQL. Minimum 3 years of backend experience.
+Strong communication and teamwork are expected.
+"""
+
+def synthetic_resume_text(index: int, rng: random.Random) -> str:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}"
+    skills = rng.sample(SKILLS, rng.randint(3, 8))
+    start = rng.randint(2012, 2021)
+    lines = [
+        f"Name: {name}",
+        f"Email: candidate{index}@example.com",
+        f"Phone: +1 555 010 {index:04d}",
+        f"Skills: {', '.join(skills)}",
+        "",
+        "Experience",
+        f"Software Engineer, Company {index % 17} ({start} - Present)",
+        f"Built services with {skills[0]} and {skills[-1]}; owned on-call and releases.",
+        "",
+        "Education",
+        "B.Tech Computer Science",
+        "",
+        "Projects",
+    ]
+    for p in range(rng.randint(1, 4)):
+        lines.append(f"Project {p}: a {rng.choice(skills)} system handling {rng.randint(1, 99)}k requests/day.")
+    return "\n".join(lines)
+
+def write_resume_pdf(path: str, text: str, pages: int = 1):
+    doc = pymupdf.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        body = text if page_number == 0 else "Additional experience and references.\n" + text
+        page.insert_textbox(pymupdf.Rect(50, 50, 550, 800), body, fontsize=10)
+    doc.save(path)
+    doc.close()
+
+def generate_corpus(directory: str, count: int, seed: int = 42) -> list:
+    """
+    Writes `count` synthetic one-to-two page PDF resumes and returns their paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"resume_{i:05d}.pdf")
+        write_resume_pdf(path, synthetic_resume_text(i, rng), pages=rng.choice([1, 1, 2]))
+        paths.append(path)
+    return paths
@@ -0,0 +1,178 @@
+import json
+import random
+import re
+import threading
+import time
+from orchestrator.registry import ClientRegistry
+from tools.slack_notifier import SlackNotifier
+
+class FakeLatency:
+    """
+    Sleeps for a latency drawn around `mean` seconds and fails with probability `error_rate`.
+    """
+
+    def __init__(self, mean: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.mean = mean
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self, label: str):
+        with self._lock:
+            delay = self._random.uniform(0.5, 1.5) * self.mean
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError(f"Injected {label} failure")
+
+class FakeResponse:
+    def __init__(self, text: str, prompt: str):
+        self.text = text
+        # Mirrors the shape of genai's usage_metadata closely enough for tools.llm_client
+        self.usage_metadata = type("Usage", (), {
+            "prompt_token_count": len(prompt) // 4,
+            "candidates_token_count": len(text) // 4,
+        })()
+
+class FakeGenerativeModel:
+    """
+    Stands in for google.generativeai.GenerativeModel.
+    Recognises each agent's prompt and returns a plausible, schema-valid JSON answer.
+    """
+
+    def __init__(self, model_name: str, latency: FakeLatency):
+        self.model_name = model_name
+        self.latency = latency
+
+    def generate_content(self, prompt: str, **kwargs):
+        self.latency.wait("LLM")
+        return FakeResponse(self._answer(prompt), prompt)
+
+    def _answer(self, prompt: str) -> str:
+        if "analyzing job descriptions" in prompt:
+            return json.dumps({
+                "role": "Backend Engineer",
+                "skills": ["Python", "Kubernetes", "SQL", "REST API", "Docker"],
+                "tools": ["AWS", "Git"],
+                "experience_years": 3,
+                "soft_skills": ["communication", "teamwork"],
+            })
+
+        if "resume parser" in prompt:
+            text = prompt.split("RESUME TEXT:")[-1]
+            name = re.search(r"Name:\s*(.+)", text)
+            skills = re.search(r"Skills:\s*(.+)", text)
+            email = re.search(r"Email:\s*(\S+)", text)
+            phone = re.search(r"Phone:\s*(.+)", text)
+            return json.dumps({
+                "name": name.group(1).strip() if name else "Unknown",
+                "email": email.group(1) if email else "candidate@example.com",
+                "phone": phone.group(1).strip() if phone else "+1 555 0100",
+                "skills": [s.strip() for s in skills.group(1).split(",")] if skills else [],
+                "education": ["B.Tech Computer Science"],
+                "experience": [{"company": "Acme", "role": "Engineer", "duration": "2019 - 2023"}],
+                "projects": [{"title": "Pipeline", "description": "Built a data pipeline."}],
+            })
+
+        candidates = len(re.findall(r"\*\*Candidate \d+:\*\*", prompt))
+        if candidates:
+            return json.dumps({"results": [
+                {"candidate": i, "score": 60 + (i * 7) % 35, "summary": "Synthetic batch evaluation."}
+                for i in range(candidates)
+            ]})
+
+        if "hiring evaluator" in prompt:
+            return json.dumps({"score": 78, "summary": "Synthetic evaluation."})
+
+        if "reusable email templates" in prompt:
+            decision = "invite" if "DECISION: invite" in prompt else "rejection"
+            return json.dumps({
+                "subject": "Your application for {role}",
+                "body": f"Dear {{candidate_name}},\n\nThank you for applying for {{role}} ({decision}).\n\n"
+                        "{personal_line}\n\nRegards,\nHiring Team",
+            })
+
+        if "personalizing a recruiter email" in prompt:
+            return json.dumps({"sentence": "Your pipeline project stood out to us."})
+
+        if "professional emails" in prompt:
+            decision = "invite" if 'DECISION: invite' in prompt else "rejection"
+            return json.dumps({
+                "subject": f"Your application ({decision})",
+                "body": "Dear candidate,\n\nThank you for applying.\n\nRegards,\nHiring Team",
+                "type": decision,
+            })
+
+        return "{}"
+
+class FakeSlackNotifier(SlackNotifier):
+    def __init__(self, latency: FakeLatency, channel: str = "#hiring"):
+        super().__init__(token="xoxb-benchmark", channel=channel)
+        self.latency = latency
+
+    def post_message(self, message: str, blocks: list = None):
+        self.latency.wait("Slack")
+        return {"ok": True}
+
+class _FakeRequest:
+    def __init__(self, body: dict, latency: FakeLatency):
+        self.body = body
+        self.latency = latency
+
+    def execute(self):
+        self.latency.wait("Calendar")
+        return {"htmlLink": f"https://calendar.example.com/{abs(hash(self.body['summary']))}"}
+
+class _FakeBatch:
+    def __init__(self, callback, latency: FakeLatency):
+        self.callback = callback
+        self.latency = latency
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        # One round trip for the whole batch
+        self.latency.wait("Calendar")
+        for request_id, request in self.requests:
+            self.callback(request_id, {"htmlLink": f"https://calendar.example.com/{request_id}"}, None)
+
+class FakeCalendarService:
+    """
+    Implements the slice of the Calendar v3 service used by tools.google_calendar.
+    """
+
+    def __init__(self, latency: FakeLatency):
+        self.latency = latency
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId: str, body: dict):
+        return _FakeRequest(body, self.latency)
+
+    def new_batch_http_request(self, callback=None):
+        return _FakeBatch(callback, self.latency)
+
+class FakeClientRegistry(ClientRegistry):
+    """
+    ClientRegistry whose models and Slack clients are local fakes.
+    """
+
+    def __init__(self, config: dict, llm_latency: FakeLatency, slack_latency: FakeLatency):
+        super().__init__(config)
+        self.llm_latency = llm_latency
+        self.slack_latency = slack_latency
+
+    def model(self, model_name: str):
+        with self._lock:
+            if model_name not in self._models:
+                self._models[model_name] = FakeGenerativeModel(model_name, self.llm_latency)
+            return self._models[model_name]
+
+    def slack_notifier(self, channel: str = "#hiring"):
+        with self._lock:
+            if channel not in self._notifiers:
+                self._notifiers[channel] = FakeSlackNotifier(self.slack_latency, channel)
+            return self._notifiers[channel]
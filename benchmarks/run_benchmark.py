@@ -0,0 +1,154 @@
+"""
+Offline pipeline benchmark: no Gemini quota, Slack or Google Calendar needed.
+
+    python -m benchmarks.run_benchmark --sizes 10 100 1000
+    python -m benchmarks.run_benchmark --save-baseline      # record benchmarks/baseline.json
+    python -m benchmarks.run_benchmark --compare            # fail on regressions vs the baseline
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import SAMPLE_JD, generate_corpus
+from benchmarks.fakes import FakeCalendarService, FakeClientRegistry, FakeLatency
+from orchestrator.graph.graph_builder import create_graph
+from tools import google_calendar
+from tools.metrics import METRICS
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_once(paths: list, args) -> dict:
+    config = {
+        "gemini_key": "benchmark",
+        "slack_token": "xoxb-benchmark",
+        "cache_dir": "",
+        "graph_mode": args.graph_mode,
+        "ranking_mode": args.ranking_mode,
+        "parse_concurrency": args.concurrency,
+        "candidate_concurrency": args.concurrency,
+        "pdf_workers": args.pdf_workers,
+        "slack_rate_per_second": 1000,
+        "slack_burst": 1000,
+        # Fakes have no Gemini quota to respect
+        "llm_rpm": 0,
+        "llm_tpm": 0,
+    }
+    registry = FakeClientRegistry(
+        config,
+        llm_latency=FakeLatency(args.llm_latency, args.error_rate, seed=1),
+        slack_latency=FakeLatency(args.api_latency, 0.0, seed=2),
+    )
+    google_calendar._service = FakeCalendarService(FakeLatency(args.api_latency, 0.0, seed=3))
+
+    METRICS.reset()
+    graph = create_graph(config, registry)
+    start = time.perf_counter()
+    final_state = graph.invoke({"jd_text": SAMPLE_JD, "resume_paths": paths})
+    wall = time.perf_counter() - start
+
+    nodes = {
+        name: {
+            "p50": round(hist.percentile(50), 4),
+            "p95": round(hist.percentile(95), 4),
+            "calls": hist.count,
+        }
+        for (kind, name), hist in METRICS.latencies.items()
+        if kind == "node"
+    }
+    return {
+        "candidates": len(paths),
+        "completed": len(final_state.get("rankings", [])),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_s": round(len(paths) / wall, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "nodes": nodes,
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns human-readable regressions: throughput down, or node p95 up, by more than tolerance.
+    """
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get(size)
+        if not base:
+            continue
+        if result["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{size}: throughput {result['throughput_per_s']}/s vs baseline {base['throughput_per_s']}/s"
+            )
+        for node, stats in result["nodes"].items():
+            base_p95 = base["nodes"].get(node, {}).get("p95")
+            # Ignore sub-10ms nodes, where noise dominates
+            if base_p95 and base_p95 > 0.01 and stats["p95"] > base_p95 * (1 + tolerance):
+                regressions.append(f"{size}: {node} p95 {stats['p95']}s vs baseline {base_p95}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline HR Copilot pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--graph-mode", default="staged", choices=["staged", "fanout"])
+    parser.add_argument("--ranking-mode", default="llm", choices=["llm", "heuristic", "hybrid"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pdf-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="mean fake LLM latency (s)")
+    parser.add_argument("--api-latency", type=float, default=0.01, help="mean fake Slack/Calendar latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake LLM calls that fail")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--output", help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="hr-copilot-bench-") as corpus_dir:
+        all_paths = generate_corpus(corpus_dir, max(args.sizes))
+        for size in sorted(args.sizes):
+            print(f"\n=== Benchmark: {size} candidates ({args.graph_mode}, {args.ranking_mode}) ===")
+            results[str(size)] = run_once(all_paths[:size], args)
+
+    print("\n=== Results ===")
+    print(f"{'size':>6}  {'wall s':>8}  {'cand/s':>8}  {'peak MB':>8}")
+    for size, result in results.items():
+        print(
+            f"{size:>6}  {result['wall_seconds']:>8}  "
+            f"{result['throughput_per_s']:>8}  {result['peak_rss_mb']:>8}"
+        )
+        for node, stats in sorted(result["nodes"].items()):
+            print(f"        {node:<20} p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+
+    if args.compare:
+        if not os.path.exists(BASELINE_PATH):
+            print("No baseline found; run with --save-baseline first.")
+            return 2
+        with open(BASELINE_PATH) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Non-interactive bulk ingest for cron or queue-driven runs.
+
+    python ingest.py --jd jd.txt resumes/ "inbox/**/*.pdf" batch.zip -o results.jsonl
+
+Candidates stream through the per-candidate pipeline and one JSONL record is
+written as soon as each finishes; at most --concurrency resumes are in flight.
+Duplicate applicants are matched in input order as resumes are read, before
+any LLM call; they are written with a "duplicate" field and skip ranking,
+emails and Slack.
+
+Exit codes: 0 all candidates processed, 1 some failed (records carry "error"),
+2 bad arguments or no resumes found, 3 JD analysis failed or every candidate failed.
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from main import load_config
+from orchestrator.candidate_store import default_requisition_id, get_store
+from orchestrator.graph.graph_builder import create_candidate_graph
+from orchestrator.graph.nodes import candidate_node, jd_analyzer_node, _dead_letter, _duplicate, _iter_matches
+from orchestrator.registry import ClientRegistry
+from agents.resume_parser import ResumeParser
+from tools.metrics import METRICS
+from tools.slack_dispatcher import flush_all
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+def iter_sources(inputs: list):
+    """
+    Lazily yields (label, path, zip_member) for every PDF under the given
+    directories, glob patterns, zip archives or plain files. zip_member is None
+    for files on disk.
+    """
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        path = os.path.join(root, name)
+                        yield path, path, None
+        elif zipfile.is_zipfile(item):
+            with zipfile.ZipFile(item) as archive:
+                members = [m for m in archive.namelist() if m.lower().endswith(".pdf")]
+            for member in members:
+                yield f"{item}:{member}", item, member
+        elif os.path.isfile(item):
+            yield item, item, None
+        else:
+            for path in glob.iglob(item, recursive=True):
+                if path.lower().endswith(".pdf") and os.path.isfile(path):
+                    yield path, path, None
+
+class Progress:
+    """
+    A single-line progress bar on stderr; falls back to periodic lines when stderr is not a TTY.
+    """
+
+    def __init__(self, total: int, enabled: bool = True):
+        self.total = total
+        self.enabled = enabled
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self.interactive = sys.stderr.isatty()
+
+    def update(self, failed: bool):
+        self.done += 1
+        self.failed += int(failed)
+        if not self.enabled:
+            return
+        if self.interactive:
+            filled = int(30 * self.done / max(self.total, 1))
+            sys.stderr.write(f"\r[{'#' * filled}{'.' * (30 - filled)}] {self._status()}")
+            sys.stderr.flush()
+        elif self.done == self.total or self.done % 50 == 0:
+            sys.stderr.write(f"[Ingest] {self._status()}\n")
+
+    def close(self):
+        if self.enabled and self.interactive:
+            sys.stderr.write("\n")
+
+    def _status(self) -> str:
+        rate = self.done / max(time.perf_counter() - self.start, 1e-9)
+        return f"{self.done}/{self.total} done, {self.failed} failed, {rate:.1f}/s"
+
+def load_source(source: tuple):
+    """
+    The PDF for one (label, path, zip_member) source: a path on disk, or the zip
+    member's bytes read straight into memory without touching disk.
+    """
+    _, path, member = source
+    if member is None:
+        return path
+    with zipfile.ZipFile(path) as archive:
+        return archive.read(member)
+
+def process_resume(candidate_graph, config: dict, jd_result: dict, source: tuple, index: int) -> dict:
+    """
+    Runs one resume through the candidate graph and returns its record. A
+    resume that cannot be read or parsed is dead-lettered under the
+    "resume_parser" stage, so a duplicate copy of it can be tried instead.
+    """
+    label = source[0]
+    try:
+        pdf = load_source(source)
+    except Exception as e:
+        # e.g. an unreadable zip member
+        return {"index": index, "resume_path": label, "error": _dead_letter("resume_parser", label, e)}
+    state = {"index": index, "resume_path": pdf, "label": label, "jd_result": jd_result}
+    return candidate_node(state, candidate_graph, config)["candidates"][0]
+
+def run(args, config: dict, out) -> int:
+    with open(args.jd) as f:
+        jd_text = f.read()
+
+    sources = list(iter_sources(args.inputs))
+    total = len(sources)
+    if total == 0:
+        print("[Ingest] No PDF resumes found in the given inputs.", file=sys.stderr)
+        return EXIT_USAGE
+
+    registry = ClientRegistry(config)
+    METRICS.configure(
+        trace_path=config.get("trace_path"),
+        port=config.get("metrics_port"),
+        host=config.get("metrics_host", "127.0.0.1"),
+    )
+    try:
+        jd_result = jd_analyzer_node({"jd_text": jd_text}, config, registry)["jd_result"]
+    except Exception as e:
+        print(f"[Ingest] JD analysis failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    candidate_graph = create_candidate_graph(config, registry)
+    store = None
+    if config.get("candidate_store_path"):
+        store = get_store(config["candidate_store_path"])
+        requisition_id = args.requisition or default_requisition_id(jd_text)
+        store.upsert_requisition(requisition_id, jd_result)
+    progress = Progress(total, enabled=not args.no_progress)
+
+    def write(record: dict):
+        out.write(json.dumps(record, default=str) + "\n")
+        out.flush()
+        if store is not None and record.get("resume"):
+            store.add_candidates(
+                requisition_id, [record["resume"]], [record["ranking"]],
+                [record["email"]], [record["calendar"] or {}], [record["slack"]],
+            )
+        progress.update(failed=bool(record.get("error")))
+
+    def write_duplicate(member: dict, kept: str):
+        item = sources[member["index"]][0]
+        write({"index": member["index"], "resume_path": item, "duplicate": _duplicate(member, item, kept, config)})
+
+    # Duplicates are matched in input order as resumes are read. Each applicant's
+    # first copy starts as soon as it is matched; later copies wait for it and
+    # are only processed if every copy before them fails to parse.
+    matches = _iter_matches(
+        registry.agent(ResumeParser), sources, {**config, "parse_concurrency": args.concurrency},
+        load=load_source,
+    )
+    # Per original index: the label of the copy kept, whether a copy is in
+    # flight, and the copies waiting on it
+    applicants = {}
+
+    # Keep at most `concurrency` resumes in flight so memory stays flat
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        pending = {}
+
+        def submit(original: int, index: int):
+            applicants[original]["running"] = True
+            future = executor.submit(process_resume, candidate_graph, config, jd_result, sources[index], index)
+            pending[future] = original
+
+        while True:
+            for i, match in matches:
+                if match is None:
+                    applicants[i] = {"kept": None, "running": False, "waiting": []}
+                    submit(i, i)
+                else:
+                    original = match.pop("duplicate_of")
+                    applicant = applicants[original]
+                    member = {"index": i, **match}
+                    if applicant["kept"] is not None:
+                        write_duplicate(member, applicant["kept"])
+                    elif applicant["running"]:
+                        applicant["waiting"].append(member)
+                    else:
+                        # Every earlier copy failed to parse; try this one
+                        submit(original, i)
+                if len(pending) >= args.concurrency:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                original = pending.pop(future)
+                applicant = applicants[original]
+                applicant["running"] = False
+                record = future.result()
+                write(record)
+                error = record.get("error")
+                if error and error["stage"] == "resume_parser":
+                    if applicant["waiting"]:
+                        submit(original, applicant["waiting"].pop(0)["index"])
+                    continue
+                applicant["kept"] = record["resume_path"]
+                for member in applicant["waiting"]:
+                    write_duplicate(member, applicant["kept"])
+                applicant["waiting"] = []
+    progress.close()
+
+    # Background Slack deliveries may still be in flight
+    flush_all(timeout=300)
+
+    if progress.failed == total:
+        return EXIT_FAILED
+    return EXIT_PARTIAL if progress.failed else EXIT_OK
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk resume ingest with streaming JSONL output")
+    parser.add_argument("--jd", required=True, help="file containing the job description text")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories, glob patterns or zip archives")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=None, help="candidates in flight (default: CANDIDATE_CONCURRENCY)")
+    parser.add_argument("--no-progress", action="store_true", help="disable the progress bar")
+    parser.add_argument("--requisition", help="candidate store requisition id (default: derived from the JD)")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    args.concurrency = max(1, args.concurrency or config.get("candidate_concurrency", 8))
+    if not os.path.isfile(args.jd):
+        print(f"[Ingest] JD file not found: {args.jd}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.output == "-":
+        # Node logs go to stderr so stdout carries only JSONL
+        out = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            return run(args, config, out)
+    with open(args.output, "a") as out:
+        return run(args, config, out)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 import os
 from dotenv import load_dotenv
-from orchestrator.graph.graph_builder import create_graph
+from orchestrator.graph.graph_builder import create_graph, run_pipeline
+from orchestrator.requisition import Requisition
+from tools.slack_dispatcher import flush_all
+from tools.metrics import METRICS
 
 # Load API keys and configs
 load_dotenv()
@@ -11,7 +14,42 @@ def load_config():
         "openai_key": os.getenv("OPENAI_API_KEY"),
         "google_api_key": os.getenv("GOOGLE_API_KEY"),
         "slack_token": os.getenv("SLACK_BOT_TOKEN"),
-        "llm_provider": "gemini"
+        "llm_provider": "gemini",
+        "parse_concurrency": int(os.getenv("PARSE_CONCURRENCY", "4")),
+        "cache_dir": os.getenv("CACHE_DIR", ".cache"),
+        "shortlist_top_k": int(os.getenv("SHORTLIST_TOP_K", "50")),
+        "ranking_mode": os.getenv("RANKING_MODE", "llm"),
+        "graph_mode": os.getenv("GRAPH_MODE", "staged"),
+        "candidate_concurrency": int(os.getenv("CANDIDATE_CONCURRENCY", "8")),
+        "pdf_workers": int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1))),
+        "slack_digest": os.getenv("SLACK_DIGEST", "false").lower() == "true",
+        "slack_background": os.getenv("SLACK_BACKGROUND", "false").lower() == "true",
+        "trace_path": os.getenv("TRACE_PATH"),
+        "metrics_port": int(os.getenv("METRICS_PORT") or "0") or None,
+        "metrics_host": os.getenv("METRICS_HOST", "127.0.0.1"),
+        "checkpoint_path": os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite"),
+        "prompt_encoding": os.getenv("PROMPT_ENCODING", "compact"),
+        "prompt_field_token_budget": int(os.getenv("PROMPT_FIELD_TOKEN_BUDGET", "60")),
+        "llm_timeout": float(os.getenv("LLM_TIMEOUT", "120")),
+        "llm_max_retries": int(os.getenv("LLM_MAX_RETRIES", "3")),
+        "llm_hedge": os.getenv("LLM_HEDGE", "true").lower() == "true",
+        "jd_model": os.getenv("JD_MODEL", "gemini-2.5-pro"),
+        "resume_model": os.getenv("RESUME_MODEL", "gemini-2.5-pro"),
+        "ranker_model": os.getenv("RANKER_MODEL", "gemini-2.5-pro"),
+        "email_model": os.getenv("EMAIL_MODEL", "gemini-2.5-pro"),
+        "model_cascade": os.getenv("MODEL_CASCADE", "false").lower() == "true",
+        "cascade_fast_model": os.getenv("CASCADE_FAST_MODEL", "gemini-2.5-flash"),
+        "cascade_borderline_band": int(os.getenv("CASCADE_BORDERLINE_BAND", "10")),
+        "llm_rpm": int(os.getenv("LLM_RPM", "150")),
+        "llm_tpm": int(os.getenv("LLM_TPM", "2000000")),
+        "run_priority": os.getenv("RUN_PRIORITY", "batch"),
+        "email_mode": os.getenv("EMAIL_MODE", "llm"),
+        "email_tone": os.getenv("EMAIL_TONE", "formal"),
+        "email_personalize": os.getenv("EMAIL_PERSONALIZE", "false").lower() == "true",
+        "candidate_store_path": os.getenv("CANDIDATE_STORE_PATH", ".cache/candidates.sqlite"),
+        "dedup": os.getenv("DEDUP", "true").lower() == "true",
+        "dedup_threshold": float(os.getenv("DEDUP_THRESHOLD", "0.8")),
+        "dedup_action": os.getenv("DEDUP_ACTION", "merge")
     }
 
 def main():
@@ -22,16 +60,35 @@ def main():
     jd_text = input("Paste job description text: ")
     resume_paths = input("Enter resume PDF path(s) (comma-separated for multiple): ").split(",")
 
+    # With REQUISITION_ID set, only new or changed resumes are processed
+    requisition_id = os.getenv("REQUISITION_ID")
+    if requisition_id:
+        requisition = Requisition(requisition_id, config)
+        leaderboard = requisition.update(jd_text, [path.strip() for path in resume_paths])
+        print(f"\n=== Requisition {requisition_id}: {len(leaderboard)} candidate(s) ===")
+        for rank, entry in enumerate(leaderboard, 1):
+            flag = " (decision changed; review email)" if entry["decision_changed"] else ""
+            print(f"{rank:>3}. {entry['score']:>3}  {entry['name']}{flag}")
+        flush_all(timeout=300)
+        return
+
     # Build the graph
     graph = create_graph(config)
 
-    # Run the graph
-    final_state = graph.invoke({
+    # Run the graph; set RUN_ID to resume a run that crashed part-way
+    run_id, final_state = run_pipeline(graph, {
         "jd_text": jd_text,
         "resume_paths": [path.strip() for path in resume_paths],
-    })
+    }, run_id=os.getenv("RUN_ID"))
+
+    print(f"\n=== Workflow completed! (run id: {run_id}) ===")
+
+    for failure in final_state.get("dead_letters", []):
+        print(f"⚠️ {failure['stage']} failed for {failure['item']}: {failure['error']}")
 
-    print("\n=== Workflow completed! ===")
+    for duplicate in final_state.get("duplicates", []):
+        verb = "flagged for review as a duplicate of" if duplicate["action"] == "review" else "merged into"
+        print(f"🔁 {duplicate['item']} {verb} {duplicate['duplicate_of']} ({duplicate['reason']})")
 
     # Print JD
     jd = final_state.get("jd_result", {})
@@ -66,6 +123,12 @@ def main():
         print("\n🔔Slack Notification Status:")
         print(slack)
 
+    # Background Slack deliveries may still be in flight
+    flush_all(timeout=300)
+
+    print("\n=== Latency & token summary ===")
+    print(METRICS.summary_table())
+
 
 if __name__ == "__main__":
     main()
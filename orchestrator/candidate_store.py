@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+from agents.jd_analyzer import normalize_jd_text
+from agents.skill_matcher import canonicalize_skill
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requisitions (
+    id TEXT PRIMARY KEY,
+    role TEXT,
+    jd_result TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    requisition_id TEXT NOT NULL REFERENCES requisitions (id),
+    candidate_key TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    phone TEXT,
+    resume TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    summary TEXT,
+    email_type TEXT,
+    email_subject TEXT,
+    calendar_link TEXT,
+    calendar_status TEXT,
+    slack_status TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (requisition_id, candidate_key)
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_requisition_score ON candidates (requisition_id, score DESC);
+CREATE INDEX IF NOT EXISTS idx_candidates_score ON candidates (score DESC);
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    skill TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    PRIMARY KEY (skill, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate ON candidate_skills (candidate_id);
+"""
+
+CANDIDATE_COLUMNS = (
+    "c.id, c.requisition_id, r.role, c.name, c.email, c.phone, c.score, c.summary, "
+    "c.email_type, c.email_subject, c.calendar_link, c.calendar_status, c.slack_status"
+)
+
+def default_requisition_id(jd_text: str) -> str:
+    """
+    Requisition id for runs that don't name one: stable for the same (normalized) JD.
+    """
+    return "jd-" + hashlib.sha256(normalize_jd_text(jd_text).encode("utf-8")).hexdigest()[:12]
+
+def candidate_key(resume: dict) -> str:
+    """
+    Identifies a candidate within a requisition: their email, else a hash of the parsed resume.
+    """
+    email = (resume.get("email") or "").strip().lower()
+    if "@" in email:
+        return email
+    return hashlib.sha256(json.dumps(resume, sort_keys=True).encode("utf-8")).hexdigest()
+
+class CandidateStore:
+    """
+    Persistent, queryable store of pipeline results across requisitions.
+    - candidates holds each candidate's parsed resume, ranking, email, calendar
+      and Slack outcome, indexed by (requisition, score) and by score.
+    - candidate_skills is a normalized (canonical skill, candidate) join table,
+      so skill filters are index lookups rather than JSON scans.
+    - Re-running a requisition updates candidates in place.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def upsert_requisition(self, requisition_id: str, jd_result: dict, status: str = "open"):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO requisitions (id, role, jd_result, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    role = excluded.role, jd_result = excluded.jd_result, updated_at = excluded.updated_at
+                """,
+                (requisition_id, jd_result.get("role"), json.dumps(jd_result), status, now, now),
+            )
+
+    def set_requisition_status(self, requisition_id: str, status: str):
+        """
+        E.g. "closed" to drop a filled role from open-role queries.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE requisitions SET status = ?, updated_at = ? WHERE id = ?",
+                (status, time.time(), requisition_id),
+            )
+
+    def add_candidates(self, requisition_id: str, resumes: list, rankings: list,
+                       emails: list, calendars: list, slacks: list) -> int:
+        """
+        Upserts one row per candidate (aligned per-stage lists, as in the graph
+        state) and refreshes their skills, in a single transaction.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            for resume, ranking, email, calendar, slack in zip(resumes, rankings, emails, calendars, slacks):
+                row = self._conn.execute(
+                    """
+                    INSERT INTO candidates (
+                        requisition_id, candidate_key, name, email, phone, resume, score, summary,
+                        email_type, email_subject, calendar_link, calendar_status, slack_status, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (requisition_id, candidate_key) DO UPDATE SET
+                        name = excluded.name, email = excluded.email, phone = excluded.phone,
+                        resume = excluded.resume, score = excluded.score, summary = excluded.summary,
+                        email_type = excluded.email_type, email_subject = excluded.email_subject,
+                        calendar_link = excluded.calendar_link, calendar_status = excluded.calendar_status,
+                        slack_status = excluded.slack_status, updated_at = excluded.updated_at
+                    RETURNING id
+                    """,
+                    (
+                        requisition_id, candidate_key(resume), resume.get("name"), resume.get("email"),
+                        resume.get("phone"), json.dumps(resume), ranking["score"], ranking.get("summary"),
+                        email.get("type"), email.get("subject"), calendar.get("calendar_event"),
+                        calendar.get("status"), slack.get("status"), now,
+                    ),
+                ).fetchone()
+                candidate_id = row["id"]
+                skills = {canonicalize_skill(skill) for skill in resume.get("skills", []) if skill}
+                self._conn.execute("DELETE FROM candidate_skills WHERE candidate_id = ?", (candidate_id,))
+                self._conn.executemany(
+                    "INSERT INTO candidate_skills (skill, candidate_id) VALUES (?, ?)",
+                    [(skill, candidate_id) for skill in skills],
+                )
+        return len(resumes)
+
+    def _query(self, sql: str, params: list) -> List[dict]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def top_k(self, k: int = 10, requisition_id: Optional[str] = None,
+              min_score: Optional[int] = None, status: Optional[str] = "open") -> List[dict]:
+        """
+        Highest-scoring candidates, in one requisition or across all requisitions with `status`.
+        """
+        where, params = self._filters(requisition_id, min_score, status)
+        return self._query(
+            f"""
+            SELECT {CANDIDATE_COLUMNS} FROM candidates c JOIN requisitions r ON r.id = c.requisition_id
+            {where} ORDER BY c.score DESC LIMIT ?
+            """,
+            params + [k],
+        )
+
+    def search(self, skills: List[str], min_score: Optional[int] = None,
+               requisition_id: Optional[str] = None, status: Optional[str] = "open",
+               limit: int = 100) -> List[dict]:
+        """
+        Candidates having every skill in `skills` (synonyms canonicalized), best first.
+        E.g. search(["Kubernetes"], min_score=75) finds strong Kubernetes
+        candidates across all open roles.
+        """
+        canonical = sorted({canonicalize_skill(skill) for skill in skills})
+        where, params = self._filters(requisition_id, min_score, status)
+        placeholders = ", ".join("?" for _ in canonical)
+        return self._query(
+            f"""
+            SELECT {CANDIDATE_COLUMNS} FROM candidates c
+            JOIN requisitions r ON r.id = c.requisition_id
+            JOIN (
+                SELECT candidate_id FROM candidate_skills
+                WHERE skill IN ({placeholders})
+                GROUP BY candidate_id HAVING COUNT(*) = ?
+            ) s ON s.candidate_id = c.id
+            {where} ORDER BY c.score DESC LIMIT ?
+            """,
+            canonical + [len(canonical)] + params + [limit],
+        )
+
+    @staticmethod
+    def _filters(requisition_id, min_score, status):
+        clauses, params = [], []
+        if requisition_id is not None:
+            clauses.append("c.requisition_id = ?")
+            params.append(requisition_id)
+        elif status is not None:
+            clauses.append("r.status = ?")
+            params.append(status)
+        if min_score is not None:
+            clauses.append("c.score >= ?")
+            params.append(min_score)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(path: str) -> CandidateStore:
+    """
+    Returns the process-wide CandidateStore for the given path.
+    """
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CandidateStore(path)
+        return _stores[path]
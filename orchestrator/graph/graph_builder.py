@@ -1,26 +1,118 @@
+import os
+import sqlite3
+import uuid
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import StateGraph
-from orchestrator.state.context import WorkflowState
+from langgraph.types import Send
+from orchestrator.state.context import WorkflowState, CandidateState
+from orchestrator.registry import ClientRegistry
+from tools.metrics import METRICS, instrument_node
 from orchestrator.graph.nodes import (
     jd_analyzer_node,
     resume_parser_node,
+    shortlist_node,
     candidate_ranker_node,
     email_generator_node,
     calendar_node,
     slack_notifier_node,
+    dedup_node,
+    candidate_parse_node,
+    candidate_rank_node,
+    candidate_email_node,
+    candidate_calendar_node,
+    candidate_notify_node,
+    candidate_node,
+    collect_candidates_node,
+    candidate_store_node,
 )
 
-def create_graph(config):
+def _add_node(workflow, name: str, fn, prefix: str = ""):
+    """
+    Adds a node whose wall time is recorded in METRICS as ("node", prefix + name).
+    """
+    workflow.add_node(name, instrument_node(prefix + name, fn))
+
+def _create_checkpointer(config):
+    """
+    SQLite checkpointer at config["checkpoint_path"], or None when checkpointing is off.
+    """
+    path = config.get("checkpoint_path")
+    if not path:
+        return None
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+
+def _add_store_step(workflow, last_node: str, config):
+    """
+    With candidate_store_path set, results are saved to the candidate store after last_node.
+    """
+    if not config.get("candidate_store_path"):
+        workflow.set_finish_point(last_node)
+        return
+    _add_node(workflow, "candidate_store", lambda s: candidate_store_node(s, config))
+    workflow.add_edge(last_node, "candidate_store")
+    workflow.set_finish_point("candidate_store")
+
+def create_graph(config, registry: ClientRegistry = None, checkpointer=None):
+    """
+    Builds the hiring workflow.
+    - graph_mode="staged" (default): each stage processes the whole batch before the next starts.
+    - graph_mode="fanout": each candidate runs its own parse -> notify path in parallel.
+    All nodes share one ClientRegistry; pass one in to share clients across graphs.
+    Every node's wall time is recorded in tools.metrics.METRICS.
+    With checkpoint_path set (or a checkpointer passed in), progress is saved per
+    node, and per candidate branch in fan-out mode; see run_pipeline.
+    """
+    registry = registry or ClientRegistry(config)
+    checkpointer = checkpointer or _create_checkpointer(config)
+    METRICS.configure(
+        trace_path=config.get("trace_path"),
+        port=config.get("metrics_port"),
+        host=config.get("metrics_host", "127.0.0.1"),
+    )
+    if config.get("graph_mode", "staged") == "fanout":
+        return create_fanout_graph(config, registry, checkpointer)
+    return create_staged_graph(config, registry, checkpointer)
+
+def run_pipeline(graph, inputs: dict, run_id: str = None):
+    """
+    Invokes the graph under a run id (the checkpointer's thread id).
+    Re-running a run id that crashed resumes from its last checkpoint, skipping
+    completed work; re-running a finished run id returns its stored final state.
+    Returns (run_id, final_state).
+    """
+    run_id = run_id or uuid.uuid4().hex
+    run_config = {"configurable": {"thread_id": run_id}}
+
+    if graph.checkpointer:
+        # Printed up front so a crashed run can still be resumed by id
+        print(f"[Pipeline] Run id {run_id} (set RUN_ID={run_id} to resume it if it fails)")
+        snapshot = graph.get_state(run_config)
+        if snapshot.next:
+            print(f"[Pipeline] Resuming run {run_id} at {', '.join(snapshot.next)}")
+            return run_id, graph.invoke(None, run_config)
+        if snapshot.values:
+            print(f"[Pipeline] Run {run_id} already completed; returning stored results")
+            return run_id, snapshot.values
+
+    return run_id, graph.invoke(inputs, run_config)
+
+def create_staged_graph(config, registry: ClientRegistry, checkpointer=None):
     workflow = StateGraph(WorkflowState)
 
-    workflow.add_node("jd_analyzer", lambda s: jd_analyzer_node(s, config))
-    workflow.add_node("resume_parser", lambda s: resume_parser_node(s, config))
-    workflow.add_node("candidate_ranker", lambda s: candidate_ranker_node(s, config))
-    workflow.add_node("email_generator", lambda s: email_generator_node(s, config))
-    workflow.add_node("calendar", lambda s: calendar_node(s, config))
-    workflow.add_node("slack_notifier", lambda s: slack_notifier_node(s, config))
+    _add_node(workflow, "jd_analyzer", lambda s: jd_analyzer_node(s, config, registry))
+    _add_node(workflow, "resume_parser", lambda s: resume_parser_node(s, config, registry))
+    _add_node(workflow, "shortlist", lambda s: shortlist_node(s, config))
+    _add_node(workflow, "candidate_ranker", lambda s: candidate_ranker_node(s, config, registry))
+    _add_node(workflow, "email_generator", lambda s: email_generator_node(s, config, registry))
+    _add_node(workflow, "calendar", lambda s: calendar_node(s, config, registry))
+    _add_node(workflow, "slack_notifier", lambda s: slack_notifier_node(s, config, registry))
 
     workflow.add_edge("jd_analyzer", "resume_parser")
-    workflow.add_edge("resume_parser", "candidate_ranker")
+    workflow.add_edge("resume_parser", "shortlist")
+    workflow.add_edge("shortlist", "candidate_ranker")
     workflow.add_edge("candidate_ranker", "email_generator")
 
     def email_next_step(state: WorkflowState):
@@ -35,6 +127,78 @@ def create_graph(config):
 
     workflow.add_edge("calendar", "slack_notifier")
     workflow.set_entry_point("jd_analyzer")
-    workflow.set_finish_point("slack_notifier")
+    _add_store_step(workflow, "slack_notifier", config)
+
+    return workflow.compile(checkpointer=checkpointer)
+
+def create_candidate_graph(config, registry: ClientRegistry):
+    """
+    The per-candidate path used by each fan-out branch.
+    """
+    workflow = StateGraph(CandidateState)
+
+    _add_node(workflow, "parse", lambda s: candidate_parse_node(s, config, registry), prefix="candidate.")
+    _add_node(workflow, "rank", lambda s: candidate_rank_node(s, config, registry), prefix="candidate.")
+    _add_node(workflow, "email", lambda s: candidate_email_node(s, config, registry), prefix="candidate.")
+    _add_node(workflow, "calendar", lambda s: candidate_calendar_node(s, config, registry), prefix="candidate.")
+    _add_node(workflow, "notify", lambda s: candidate_notify_node(s, config, registry), prefix="candidate.")
+
+    workflow.add_edge("parse", "rank")
+    workflow.add_edge("rank", "email")
+
+    def email_next_step(state: CandidateState):
+        return "calendar" if state["ranking"]["score"] >= 75 else "notify"
+
+    workflow.add_conditional_edges(
+        "email",
+        email_next_step,
+        {"calendar": "calendar", "notify": "notify"}
+    )
+
+    workflow.add_edge("calendar", "notify")
+    workflow.set_entry_point("parse")
+    workflow.set_finish_point("notify")
+
+    # Branches are checkpointed as a whole by the parent graph
+    return workflow.compile(checkpointer=False)
+
+def create_fanout_graph(config, registry: ClientRegistry, checkpointer=None):
+    """
+    Map-reduce workflow: after the JD is analyzed, every resume is sent to its own
+    "candidate" branch and the branches are merged by the candidates reducer.
+    """
+    candidate_graph = create_candidate_graph(config, registry)
+    workflow = StateGraph(WorkflowState)
+
+    _add_node(workflow, "jd_analyzer", lambda s: jd_analyzer_node(s, config, registry))
+    _add_node(workflow, "dedup", lambda s: dedup_node(s, config, registry))
+    _add_node(workflow, "candidate", lambda s: candidate_node(s, candidate_graph, config))
+    _add_node(workflow, "collect", lambda s: collect_candidates_node(s, config))
+
+    def dispatch_candidates(state: WorkflowState):
+        if not state["resume_paths"]:
+            return "collect"
+        # One branch per applicant; its duplicate copies ride along as alternates
+        paths = state["resume_paths"]
+        return [
+            Send("candidate", {
+                "index": group[0]["index"],
+                "resume_path": paths[group[0]["index"]],
+                "jd_result": state["jd_result"],
+                "alternates": [
+                    {**member, "resume_path": paths[member["index"]]} for member in group[1:]
+                ],
+            })
+            for group in state["resume_groups"]
+        ]
+
+    workflow.add_edge("jd_analyzer", "dedup")
+    workflow.add_conditional_edges("dedup", dispatch_candidates, ["candidate", "collect"])
+    workflow.add_edge("candidate", "collect")
+    workflow.set_entry_point("jd_analyzer")
+    _add_store_step(workflow, "collect", config)
 
-    return workflow.compile()
+    # Bounds how many candidate branches run at once
+    return workflow.compile(checkpointer=checkpointer).with_config(
+        {"max_concurrency": config.get("candidate_concurrency", 8)}
+    )
@@ -1,71 +1,482 @@
-from orchestrator.state.context import WorkflowState
-from agents.jd_analyzer import JDAnalyzer
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from orchestrator.state.context import WorkflowState, CandidateState
+from tools.result_cache import ResultCache, get_cache
+from agents.jd_analyzer import JDAnalyzer, JDAnalysisResult, normalize_jd_text
 from agents.resume_parser import ResumeParser
-from agents.candidate_ranker import CandidateRanker
+from agents.shortlister import Shortlister
+from agents.candidate_ranker import CandidateRanker, CandidateScoreResult
+from agents.skill_matcher import SkillMatcher
 from agents.email_generator import EmailGenerator
 from agents.calendar_agent import CalendarAgent
 from agents.notifier_agent import NotifierAgent
+from tools.slack_notifier import SlackResult
+from tools.pdf_extractor import describe_source
+from tools.dedup import DuplicateIndex, fingerprint
+from orchestrator.candidate_store import default_requisition_id, get_store
 
-def jd_analyzer_node(state: WorkflowState, config):
+def _jd_cache(config):
+    cache_dir = config.get("cache_dir", ".cache")
+    if not cache_dir:
+        return None
+    return get_cache(
+        os.path.join(cache_dir, "jd_analysis.sqlite"),
+        max_entries=config.get("jd_cache_entries", 500),
+        ttl=config.get("jd_cache_ttl", 7 * 24 * 3600),
+        memory_entries=config.get("jd_cache_memory_entries", 64),
+    )
+
+def jd_analyzer_node(state: WorkflowState, config, registry):
     print("\n[Node Start] JD Analyzer Agent running...")
-    jd_agent = JDAnalyzer(config)
-    result = jd_agent.analyze(state["jd_text"])
+    jd_agent = registry.agent(JDAnalyzer)
+    cache = _jd_cache(config)
+    key = ResultCache.make_key(
+        normalize_jd_text(state["jd_text"]),
+        jd_agent._build_prompt(""),
+        jd_agent.model_name,
+        getattr(jd_agent.fast_model, "model_name", None),
+    )
+
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        print("[JD Analyzer] Cache hit, skipping analysis.")
+        result = JDAnalysisResult.model_validate_json(cached)
+    else:
+        result = jd_agent.analyze(state["jd_text"])
+        if cache:
+            cache.set(key, result.model_dump_json())
     state["jd_result"] = result.model_dump()
     print("[Node Complete] JD Analyzer Agent finished.")
     return state
 
-def resume_parser_node(state: WorkflowState, config):
+def _dead_letter(stage: str, item: str, error: Exception) -> dict:
+    """
+    A failed work item, recorded in state["dead_letters"] instead of aborting the batch.
+    """
+    print(f"[Dead Letter] {stage} failed for {item}: {error}")
+    return {"stage": stage, "item": item, "error": str(error)}
+
+def _clean_source(source):
+    """
+    Strips stray whitespace from paths typed at the CLI; PDF bytes pass through untouched.
+    """
+    return source.strip() if isinstance(source, str) else source
+
+class ResumeParseError(Exception):
+    """
+    A resume the parser could not read or parse; a duplicate copy of it may be tried instead.
+    """
+
+def _fingerprint(parser: ResumeParser, source):
+    """
+    The resume's text fingerprint, or None if the PDF cannot be read (the parse
+    step then reports it as a dead letter).
+    """
+    try:
+        return fingerprint(parser.extract_text(source))
+    except Exception:
+        return None
+
+def _iter_matches(parser: ResumeParser, sources: list, config, load=_clean_source):
+    """
+    Yields (index, match) in input order, before any LLM call; match is None
+    for an original, else {"duplicate_of", "similarity", "reason"} for a
+    near-identical text or the same email or phone number in the text.
+    Fingerprints are taken in parallel but matched serially in input order, so
+    re-running a batch always keeps the same copy. Only a few resumes are
+    fingerprinted ahead of the consumer, so matches stream out as they are read.
+    """
+    if not config.get("dedup", True):
+        yield from ((i, None) for i in range(len(sources)))
+        return
+
+    index = DuplicateIndex(threshold=config.get("dedup_threshold", 0.8))
+    max_workers = max(1, int(config.get("parse_concurrency", 4)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        window = deque()
+        for i, source in enumerate(sources):
+            window.append((i, executor.submit(lambda s: _fingerprint(parser, load(s)), source)))
+            if len(window) > 2 * max_workers:
+                j, future = window.popleft()
+                yield j, index.add(j, future.result())
+        for j, future in window:
+            yield j, index.add(j, future.result())
+
+def resume_groups(parser: ResumeParser, sources: list, config, load=_clean_source) -> list:
+    """
+    Groups resumes by applicant (see _iter_matches). Each group lists its
+    original first as {"index"}, then its duplicates as {"index", "similarity",
+    "reason"}; groups are ordered by their original.
+    """
+    groups = {}
+    for i, match in _iter_matches(parser, sources, config, load):
+        if match is None:
+            groups[i] = [{"index": i}]
+        else:
+            groups[match.pop("duplicate_of")].append({"index": i, **match})
+    return list(groups.values())
+
+def _duplicate(member: dict, item: str, kept: str, config) -> dict:
+    """
+    A duplicate applicant, recorded in state["duplicates"] and dropped before
+    ranking, emails and Slack. dedup_action="merge" treats it as the original
+    candidate; "review" flags the pair for a recruiter to check.
+    """
+    print(f"[Duplicate] {item} duplicates {kept} ({member['reason']})")
+    return {
+        "item": item,
+        "duplicate_of": kept,
+        "similarity": member["similarity"],
+        "reason": member["reason"],
+        "action": config.get("dedup_action", "merge"),
+    }
+
+def _parse_group(parser: ResumeParser, sources: list, group: list, config, first=None):
+    """
+    Parses one applicant's resumes: the first copy that parses is kept, copies
+    before it that fail are dead letters and the rest are duplicates of it.
+    `first`, if given, is a future already parsing the group's original.
+    Errors are captured rather than raised so one bad file does not abort the
+    rest of the batch. Returns (result or None, dead letters, duplicates).
+    """
+    result, kept, errors, duplicates = None, None, [], []
+    for position, member in enumerate(group):
+        source = sources[member["index"]]
+        item = describe_source(source)
+        if kept is not None:
+            duplicates.append(_duplicate(member, item, kept, config))
+            continue
+        try:
+            parsed = first.result() if position == 0 and first is not None else parser.parse(source)
+            result = parsed.model_dump()
+            kept = item
+        except Exception as e:
+            errors.append(_dead_letter("resume_parser", item, e))
+    return result, errors, duplicates
+
+def resume_parser_node(state: WorkflowState, config, registry):
     print("\n[Node Start] Resume Parser Agent running...")
-    parser = ResumeParser(config)
-    results = [parser.parse(path.strip()).model_dump() for path in state["resume_paths"]]
+    parser = registry.agent(ResumeParser)
+    paths = [_clean_source(source) for source in state["resume_paths"]]
+    max_workers = max(1, int(config.get("parse_concurrency", 4)))
+
+    groups, parses = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Each original starts parsing as soon as it is matched, so fingerprinting
+        # the rest of the batch overlaps with the LLM calls
+        for i, match in _iter_matches(parser, paths, config):
+            if match is None:
+                groups[i] = [{"index": i}]
+                parses[i] = executor.submit(parser.parse, paths[i])
+            else:
+                groups[match.pop("duplicate_of")].append({"index": i, **match})
+        # Groups are ordered by their original resume; duplicates are only parsed
+        # if the original fails
+        outcomes = [
+            _parse_group(parser, paths, group, config, first=parses[i]) for i, group in groups.items()
+        ]
+
+    results = [result for result, _, _ in outcomes if result is not None]
+    errors = [error for _, group_errors, _ in outcomes for error in group_errors]
+    duplicates = [duplicate for _, _, group_duplicates in outcomes for duplicate in group_duplicates]
     state["resume_results"] = results
-    print(f"[Node Complete] Resume Parser Agent finished. Parsed {len(results)} resumes.")
+    state["dead_letters"] = state.get("dead_letters", []) + errors
+    state["duplicates"] = state.get("duplicates", []) + duplicates
+    print(
+        f"[Node Complete] Resume Parser Agent finished. Parsed {len(results)} resumes"
+        f" ({len(errors)} failed, {len(duplicates)} duplicates skipped)."
+    )
+    return state
+
+def shortlist_node(state: WorkflowState, config):
+    print("\n[Node Start] Shortlist stage running...")
+    shortlister = Shortlister(config)
+    result = shortlister.shortlist(state["jd_result"], state["resume_results"])
+    state["shortlist"] = result.selected
+    state["similarities"] = result.similarities
+    state["shortlist_exclusions"] = result.exclusions
+    print(
+        f"[Node Complete] Shortlist stage finished. {len(result.selected)} of "
+        f"{len(state['resume_results'])} candidates sent to the LLM ranker."
+    )
     return state
 
-def candidate_ranker_node(state: WorkflowState, config):
+def _score_candidates(jd_data: dict, resumes: list, config, registry) -> list:
+    """
+    Scores resumes according to ranking_mode:
+    "llm" ranks everything with the LLM, "heuristic" scores locally only,
+    and "hybrid" sends only promising candidates on to the LLM.
+    """
+    mode = config.get("ranking_mode", "llm")
+    rankings = [None] * len(resumes)
+    to_rank = list(range(len(resumes)))
+    if mode in ("heuristic", "hybrid"):
+        heuristic = SkillMatcher(config).score_batch(jd_data, resumes)
+        rankings = [ranking.model_dump() for ranking in heuristic]
+        min_score = config.get("hybrid_llm_min_score", 40)
+        if mode == "heuristic":
+            to_rank = []
+        elif not (jd_data.get("skills") or jd_data.get("tools")):
+            # Nothing to pre-filter on; let the LLM judge everyone
+            to_rank = list(range(len(resumes)))
+        else:
+            to_rank = [i for i, ranking in enumerate(heuristic) if ranking.score >= min_score]
+
+    if to_rank:
+        ranker = registry.agent(CandidateRanker)
+        ranked = ranker.rank_batch(jd_data, [resumes[i] for i in to_rank])
+        for i, ranking in zip(to_rank, ranked):
+            rankings[i] = ranking.model_dump()
+    return rankings
+
+def candidate_ranker_node(state: WorkflowState, config, registry):
     print("\n[Node Start] Candidate Ranker Agent running...")
-    ranker = CandidateRanker(config)
     jd_data = state["jd_result"]
-    rankings = [ranker.rank(jd_data, resume).model_dump() for resume in state["resume_results"]]
+    resumes = state["resume_results"]
+    shortlist = state.get("shortlist", list(range(len(resumes))))
+    similarities = state.get("similarities") or [0.0] * len(resumes)
+    exclusions = state.get("shortlist_exclusions") or ["top_k"] * len(resumes)
+
+    # Candidates that missed the shortlist get a deterministic score without an LLM call
+    shortlister = Shortlister(config)
+    rankings = [
+        CandidateScoreResult(
+            score=Shortlister.fallback_score(similarity),
+            summary=shortlister.exclusion_summary(exclusion, similarity),
+        ).model_dump()
+        for similarity, exclusion in zip(similarities, exclusions)
+    ]
+
+    # If ranking fails outright (e.g. CircuitOpenError), the shortlisted candidates
+    # are dead-lettered and dropped, keeping the per-stage lists aligned
+    failed = []
+    try:
+        scored = _score_candidates(jd_data, [resumes[i] for i in shortlist], config, registry)
+    except Exception as e:
+        failed = [_dead_letter("candidate_ranker", resumes[i].get("name", "Unknown"), e) for i in shortlist]
+        dropped = set(shortlist)
+        resumes = [r for i, r in enumerate(resumes) if i not in dropped]
+        rankings = [r for i, r in enumerate(rankings) if i not in dropped]
+    else:
+        for i, ranking in zip(shortlist, scored):
+            rankings[i] = ranking
+
+    state["resume_results"] = resumes
     state["rankings"] = rankings
+    state["dead_letters"] = state.get("dead_letters", []) + failed
     print("[Node Complete] Candidate Ranker Agent finished.")
     return state
 
-def email_generator_node(state: WorkflowState, config):
+def email_generator_node(state: WorkflowState, config, registry):
     print("\n[Node Start] Email Generator Agent running...")
-    email_gen = EmailGenerator(config)
+    email_gen = registry.agent(EmailGenerator)
     jd_data = state["jd_result"]
-    emails = [
-        email_gen.generate(resume, jd_data, ranking).model_dump()
-        for resume, ranking in zip(state["resume_results"], state["rankings"])
-    ]
+
+    # Candidates whose email cannot be generated are dead-lettered and
+    # dropped from the remaining stages, keeping the per-stage lists aligned
+    resumes, rankings, emails, failed = [], [], [], []
+    for resume, ranking in zip(state["resume_results"], state["rankings"]):
+        try:
+            emails.append(email_gen.generate(resume, jd_data, ranking).model_dump())
+        except Exception as e:
+            failed.append(_dead_letter("email_generator", resume.get("name", "Unknown"), e))
+            continue
+        resumes.append(resume)
+        rankings.append(ranking)
+
+    state["resume_results"] = resumes
+    state["rankings"] = rankings
     state["emails"] = emails
+    state["dead_letters"] = state.get("dead_letters", []) + failed
     print("[Node Complete] Email Generator Agent finished.")
     return state
 
-def calendar_node(state: WorkflowState, config):
+def calendar_node(state: WorkflowState, config, registry):
     print("\n[Node Start] Calendar Agent running...")
-    cal_agent = CalendarAgent(config)
-    calendars = []
-    for resume, ranking in zip(state["resume_results"], state["rankings"]):
-        if ranking["score"] >= 75:
-            cal = cal_agent.schedule(resume, ranking)
-        else:
-            cal = {"status": "skipped"}
-        calendars.append(cal if isinstance(cal, dict) else cal.model_dump())
+    cal_agent = registry.agent(CalendarAgent)
+    pairs = list(zip(state["resume_results"], state["rankings"]))
+    invited = [i for i, (_, ranking) in enumerate(pairs) if ranking["score"] >= 75]
+
+    # All invited candidates are scheduled in one batched Calendar API round trip.
+    # If scheduling fails (e.g. no Calendar credentials), they are dead-lettered
+    # but kept, so their email and Slack update still go out.
+    calendars = [{"status": "skipped"} for _ in pairs]
+    failed = []
+    try:
+        scheduled = cal_agent.schedule_batch([pairs[i] for i in invited]) if invited else []
+    except Exception as e:
+        failed = [_dead_letter("calendar", pairs[i][0].get("name", "Unknown"), e) for i in invited]
+        scheduled = [{"status": "failed"} for _ in invited]
+    for i, cal in zip(invited, scheduled):
+        calendars[i] = cal
     state["calendars"] = calendars
+    state["dead_letters"] = state.get("dead_letters", []) + failed
     print("[Node Complete] Calendar Agent finished.")
     return state
 
-def slack_notifier_node(state: WorkflowState, config):
+def _collect_slack_results(futures: list, config) -> list:
+    """
+    Waits for queued Slack deliveries, logging each as it finishes.
+    With slack_background set, returns "queued" results immediately instead
+    and the dispatcher keeps delivering after the graph has moved on.
+    """
+    if config.get("slack_background", False):
+        return [
+            SlackResult(status="queued", channel="#hiring", message="").model_dump()
+            for _ in futures
+        ]
+
+    for future in as_completed(futures):
+        result = future.result()
+        print(f"[Slack] Delivery {result.status}")
+    return [future.result().model_dump() for future in futures]
+
+def slack_notifier_node(state: WorkflowState, config, registry):
     print("\n[Node Start] Slack Notifier Agent running...")
-    notifier = NotifierAgent(config)
-    slacks = []
-    for resume, ranking, email, calendar in zip(
+    notifier = registry.agent(NotifierAgent)
+    # The calendar stage is skipped entirely when nobody scored 75+
+    if not state.get("calendars"):
+        state["calendars"] = [{"status": "skipped"} for _ in state["resume_results"]]
+    updates = list(zip(
         state["resume_results"], state["rankings"], state["emails"], state["calendars"]
-    ):
-        slack = notifier.send_notification(resume, ranking, email, calendar)
-        slacks.append(slack.model_dump())
-    state["slacks"] = slacks
+    ))
+    if config.get("slack_digest", False):
+        futures = notifier.queue_digest(updates)
+    else:
+        futures = [notifier.queue_notification(*update) for update in updates]
+    state["slacks"] = _collect_slack_results(futures, config)
     print("[Node Complete] Slack Notifier Agent finished.")
     return state
+
+# --- Per-candidate nodes for the fan-out graph (graph_mode="fanout") ---
+
+def dedup_node(state: WorkflowState, config, registry):
+    """
+    Fan-out only: groups duplicate resumes before dispatch, so each applicant
+    gets one branch (see resume_groups).
+    """
+    print("\n[Node Start] Checking for duplicate resumes...")
+    parser = registry.agent(ResumeParser)
+    groups = resume_groups(parser, state["resume_paths"], config)
+    print(
+        f"[Node Complete] {len(groups)} applicant(s) among {len(state['resume_paths'])} resume(s)."
+    )
+    return {"resume_groups": groups}
+
+def candidate_parse_node(state: CandidateState, config, registry):
+    parser = registry.agent(ResumeParser)
+    try:
+        state["resume"] = parser.parse(_clean_source(state["resume_path"])).model_dump()
+    except Exception as e:
+        raise ResumeParseError(str(e)) from e
+    print(f"[Candidate {state['index']}] Parsed resume for {state['resume'].get('name')}.")
+    return state
+
+def candidate_rank_node(state: CandidateState, config, registry):
+    state["ranking"] = _score_candidates(state["jd_result"], [state["resume"]], config, registry)[0]
+    print(f"[Candidate {state['index']}] Ranked with score {state['ranking']['score']}.")
+    return state
+
+def candidate_email_node(state: CandidateState, config, registry):
+    email_gen = registry.agent(EmailGenerator)
+    state["email"] = email_gen.generate(
+        state["resume"], state["jd_result"], state["ranking"]
+    ).model_dump()
+    return state
+
+def candidate_calendar_node(state: CandidateState, config, registry):
+    cal_agent = registry.agent(CalendarAgent)
+    state["calendar"] = cal_agent.schedule(state["resume"], state["ranking"])
+    return state
+
+def candidate_notify_node(state: CandidateState, config, registry):
+    notifier = registry.agent(NotifierAgent)
+    state["calendar"] = state.get("calendar") or {"status": "skipped"}
+    future = notifier.queue_notification(
+        state["resume"], state["ranking"], state["email"], state["calendar"]
+    )
+    state["slack"] = _collect_slack_results([future], config)[0]
+    print(f"[Candidate {state['index']}] Finished.")
+    return state
+
+def candidate_node(state: CandidateState, candidate_graph, config):
+    """
+    Runs one applicant through the compiled per-candidate graph and returns one
+    record per resume for the parent's candidates reducer. Duplicate copies
+    (state["alternates"]) are only tried if the copies before them fail to
+    parse; the rest are recorded under "duplicate". Failures are recorded on
+    the records rather than raised, so other branches keep running.
+    """
+    members = [
+        {"index": state["index"], "resume_path": state["resume_path"], "label": state.get("label")}
+    ] + state.get("alternates", [])
+    records, kept = [], None
+    for member in members:
+        # In-memory uploads are recorded by label rather than carrying their bytes along
+        item = member.get("label") or describe_source(member["resume_path"])
+        if kept is not None:
+            records.append({
+                "index": member["index"],
+                "resume_path": item,
+                "duplicate": _duplicate(member, item, kept, config),
+            })
+            continue
+        try:
+            final = candidate_graph.invoke({
+                "index": member["index"],
+                "resume_path": member["resume_path"],
+                "jd_result": state["jd_result"],
+            })
+            record = {
+                key: final.get(key)
+                for key in ("index", "resume", "ranking", "email", "calendar", "slack")
+            }
+            kept = item
+        except Exception as e:
+            stage = "resume_parser" if isinstance(e, ResumeParseError) else "candidate"
+            record = {"index": member["index"], "error": _dead_letter(stage, item, e)}
+            # Only an unparseable copy falls through to the next one
+            if not isinstance(e, ResumeParseError):
+                kept = item
+        record["resume_path"] = item
+        records.append(record)
+    return {"candidates": records}
+
+def collect_candidates_node(state: WorkflowState, config):
+    """
+    Reduce step: restores input order and fills the per-stage lists used by the UI and CLI.
+    """
+    print("\n[Node Start] Collecting candidate results...")
+    records = sorted(state.get("candidates", []), key=lambda r: r["index"])
+    done = [r for r in records if not r.get("error") and not r.get("duplicate")]
+    print(f"[Node Complete] Collected {len(done)} of {len(records)} candidates.")
+    return {
+        "resume_results": [r["resume"] for r in done],
+        "rankings": [r["ranking"] for r in done],
+        "emails": [r["email"] for r in done],
+        "calendars": [r["calendar"] for r in done],
+        "slacks": [r["slack"] for r in done],
+        "dead_letters": [r["error"] for r in records if r.get("error")],
+        "duplicates": [r["duplicate"] for r in records if r.get("duplicate")],
+    }
+
+def candidate_store_node(state: WorkflowState, config):
+    """
+    Saves the run's candidates to the persistent candidate store under the run's
+    requisition id (given as input, or derived from the JD text).
+    """
+    print("\n[Node Start] Saving candidates to the candidate store...")
+    requisition_id = state.get("requisition_id") or default_requisition_id(state["jd_text"])
+    store = get_store(config["candidate_store_path"])
+    store.upsert_requisition(requisition_id, state["jd_result"])
+    saved = store.add_candidates(
+        requisition_id,
+        state.get("resume_results", []),
+        state.get("rankings", []),
+        state.get("emails", []),
+        state.get("calendars", []),
+        state.get("slacks", []),
+    )
+    print(f"[Node Complete] Saved {saved} candidates to requisition {requisition_id}.")
+    return {"requisition_id": requisition_id}
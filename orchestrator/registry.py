@@ -0,0 +1,43 @@
+import threading
+import google.generativeai as genai
+from tools.slack_notifier import SlackNotifier
+
+class ClientRegistry:
+    """
+    Process-wide pool of model clients, Slack clients and agents.
+    - create_graph builds one registry and every node pulls its agents from it,
+      so genai.configure runs once and each GenerativeModel / WebClient is
+      created once and reused (along with its open connections) across runs.
+    - All lookups are thread-safe, so fan-out branches can share it.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self._lock = threading.RLock()
+        self._models = {}
+        self._notifiers = {}
+        self._agents = {}
+        genai.configure(api_key=config.get("gemini_key"))
+
+    def model(self, model_name: str) -> genai.GenerativeModel:
+        with self._lock:
+            if model_name not in self._models:
+                self._models[model_name] = genai.GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def slack_notifier(self, channel: str = "#hiring") -> SlackNotifier:
+        with self._lock:
+            if channel not in self._notifiers:
+                self._notifiers[channel] = SlackNotifier(
+                    token=self.config.get("slack_token"), channel=channel
+                )
+            return self._notifiers[channel]
+
+    def agent(self, agent_cls):
+        """
+        Returns the shared instance of an agent class, built as agent_cls(config, registry=self).
+        """
+        with self._lock:
+            if agent_cls not in self._agents:
+                self._agents[agent_cls] = agent_cls(self.config, registry=self)
+            return self._agents[agent_cls]
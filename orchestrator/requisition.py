@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import re
+from agents.resume_parser import ResumeParser
+from agents.skill_matcher import canonicalize_skill
+from agents.jd_analyzer import normalize_jd_text
+from orchestrator.graph.graph_builder import create_graph, run_pipeline
+from orchestrator.candidate_store import get_store
+from orchestrator.graph.nodes import jd_analyzer_node, _fingerprint, _score_candidates
+from orchestrator.registry import ClientRegistry
+from tools.dedup import DuplicateIndex, Fingerprint
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _stored_fingerprint(candidate: dict) -> Fingerprint:
+    """
+    The duplicate-check fingerprint saved with a candidate. Candidates saved
+    before fingerprints were kept are matched on their parsed email and phone.
+    """
+    stored = candidate.get("fingerprint")
+    if stored:
+        return Fingerprint(
+            signature=bytes.fromhex(stored["signature"]), email=stored["email"], phone=stored["phone"]
+        )
+    resume = candidate["resume"]
+    phone = re.sub(r"\D", "", str(resume.get("phone") or ""))
+    return Fingerprint(
+        signature=b"",
+        email=str(resume.get("email") or "").strip().lower(),
+        phone=phone[-10:] if len(phone) >= 10 else "",
+    )
+
+def _skill_signature(jd_result: dict) -> list:
+    """
+    The part of a JD analysis that affects ranking: its canonical skills and tools.
+    """
+    skills = jd_result.get("skills", []) + jd_result.get("tools", [])
+    return sorted({canonicalize_skill(skill) for skill in skills})
+
+class Requisition:
+    """
+    A persistent workspace for one job requisition.
+    - Stores the JD analysis and every candidate's results, keyed by the
+      SHA-256 of the resume file, in <requisitions_dir>/<requisition_id>.json.
+    - update() runs only new or changed resumes through the pipeline, and
+      re-ranks existing candidates only when the JD's extracted skills change.
+    - A new resume that duplicates a candidate already in the requisition
+      (e.g. an edited resubmission) is recorded under "duplicates" instead of
+      becoming a second entry with a second email and Slack update.
+    """
+
+    def __init__(self, requisition_id: str, config: dict, registry: ClientRegistry = None):
+        self.requisition_id = requisition_id
+        self.config = config
+        self.registry = registry or ClientRegistry(config)
+        directory = config.get("requisitions_dir", os.path.join(config.get("cache_dir") or ".cache", "requisitions"))
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{requisition_id}.json")
+
+        self.jd_text = ""
+        self.jd_result = {}
+        self.candidates = {}
+        self.duplicates = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                data = json.load(f)
+            self.jd_text = data.get("jd_text", "")
+            self.jd_result = data.get("jd_result", {})
+            self.candidates = data.get("candidates", {})
+            self.duplicates = data.get("duplicates", {})
+
+    def save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({
+                "requisition_id": self.requisition_id,
+                "jd_text": self.jd_text,
+                "jd_result": self.jd_result,
+                "candidates": self.candidates,
+                "duplicates": self.duplicates,
+            }, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def _refresh_jd(self, jd_text: str) -> bool:
+        """
+        Re-analyzes the JD if its text changed. Returns True when the extracted
+        skills changed, meaning existing rankings are stale.
+        """
+        if self.jd_result and normalize_jd_text(jd_text) == normalize_jd_text(self.jd_text):
+            return False
+
+        jd_result = jd_analyzer_node({"jd_text": jd_text}, self.config, self.registry)["jd_result"]
+        skills_changed = bool(self.jd_result) and (
+            _skill_signature(jd_result) != _skill_signature(self.jd_result)
+        )
+        self.jd_text, self.jd_result = jd_text, jd_result
+        return skills_changed
+
+    def _rerank_existing(self):
+        keys = list(self.candidates)
+        print(f"[Requisition] JD skills changed; re-ranking {len(keys)} existing candidate(s).")
+        rankings = _score_candidates(
+            self.jd_result, [self.candidates[k]["resume"] for k in keys], self.config, self.registry
+        )
+        for key, ranking in zip(keys, rankings):
+            previous = self.candidates[key]["ranking"]["score"]
+            self.candidates[key]["ranking"] = ranking
+            # Emails and calendar invites are not re-sent; flag decisions that flipped
+            self.candidates[key]["decision_changed"] = (previous >= 75) != (ranking["score"] >= 75)
+
+        # The candidate store would otherwise keep serving the old scores
+        if self.config.get("candidate_store_path"):
+            store = get_store(self.config["candidate_store_path"])
+            store.upsert_requisition(self.requisition_id, self.jd_result)
+            candidates = [self.candidates[k] for k in keys]
+            store.add_candidates(
+                self.requisition_id,
+                [c["resume"] for c in candidates],
+                [c["ranking"] for c in candidates],
+                [c.get("email", {}) for c in candidates],
+                [c.get("calendar", {}) for c in candidates],
+                [c.get("slack", {}) for c in candidates],
+            )
+
+    def _skip_existing_duplicates(self, new_paths: list, hashes: dict):
+        """
+        Matches new resumes against the requisition's existing candidates and
+        records the duplicates instead of processing them. Duplicates among the
+        new resumes themselves are left to the pipeline's own check.
+        Returns (paths still to process, fingerprints by path).
+        """
+        parser = self.registry.agent(ResumeParser)
+        index = DuplicateIndex(threshold=self.config.get("dedup_threshold", 0.8))
+        existing = list(self.candidates.values())
+        for position, candidate in enumerate(existing):
+            index.add(position, _stored_fingerprint(candidate))
+
+        remaining, fingerprints = [], {}
+        for offset, path in enumerate(new_paths):
+            fingerprints[path] = _fingerprint(parser, path)
+            match = index.add(len(existing) + offset, fingerprints[path])
+            if match is None or match["duplicate_of"] >= len(existing):
+                remaining.append(path)
+                continue
+            original = existing[match["duplicate_of"]]
+            print(f"[Duplicate] {path} duplicates existing candidate {original.get('source')} ({match['reason']})")
+            self.duplicates[hashes[path]] = {
+                "source": path,
+                "duplicate_of": original.get("source"),
+                "similarity": match["similarity"],
+                "reason": match["reason"],
+            }
+        return remaining, fingerprints
+
+    def update(self, jd_text: str, resume_paths: list) -> list:
+        """
+        Adds or refreshes resumes and returns the merged leaderboard.
+        """
+        if self._refresh_jd(jd_text) and self.candidates:
+            self._rerank_existing()
+
+        hashes = {path: _file_hash(path) for path in resume_paths}
+        new_paths = [
+            path for path, digest in hashes.items()
+            if digest not in self.candidates and digest not in self.duplicates
+        ]
+
+        # A changed file replaces the candidate previously loaded from the same path
+        replaced = set(new_paths)
+        self.candidates = {
+            key: candidate for key, candidate in self.candidates.items()
+            if candidate.get("source") not in replaced
+        }
+
+        print(
+            f"[Requisition] {len(new_paths)} new or changed resume(s); "
+            f"{len(resume_paths) - len(new_paths)} already processed."
+        )
+        fingerprints = {}
+        if new_paths and self.config.get("dedup", True):
+            new_paths, fingerprints = self._skip_existing_duplicates(new_paths, hashes)
+        if new_paths:
+            # Fan-out records carry their source path, which keys the results
+            graph = create_graph({**self.config, "graph_mode": "fanout"}, self.registry)
+            _, final_state = run_pipeline(graph, {
+                "jd_text": jd_text,
+                "resume_paths": new_paths,
+                "requisition_id": self.requisition_id,
+            })
+            for record in final_state.get("candidates", []):
+                # Duplicate applicants stay out of the leaderboard; the original is already in it
+                if record.get("error") or record.get("duplicate"):
+                    continue
+                source = record["resume_path"]
+                self.candidates[hashes[source]] = {
+                    "source": source,
+                    **{key: record[key] for key in ("resume", "ranking", "email", "calendar", "slack")},
+                }
+                fp = fingerprints.get(source)
+                if fp is not None:
+                    self.candidates[hashes[source]]["fingerprint"] = {
+                        "signature": fp.signature.hex(), "email": fp.email, "phone": fp.phone,
+                    }
+
+        self.save()
+        return self.leaderboard()
+
+    def leaderboard(self) -> list:
+        return sorted(
+            (
+                {
+                    "name": candidate["resume"].get("name", "Unknown"),
+                    "score": candidate["ranking"]["score"],
+                    "summary": candidate["ranking"]["summary"],
+                    "source": candidate.get("source"),
+                    "decision_changed": candidate.get("decision_changed", False),
+                }
+                for candidate in self.candidates.values()
+            ),
+            key=lambda entry: entry["score"],
+            reverse=True,
+        )
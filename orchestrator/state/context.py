@@ -1,12 +1,52 @@
-from typing import TypedDict, List, Dict, Any
+import operator
+from typing import Annotated, TypedDict, List, Dict, Any, Optional, Union
 
 class WorkflowState(TypedDict):
     jd_text: str
-    resume_paths: List[str]
+    # File paths, or PDF bytes for in-memory uploads (no temp files)
+    resume_paths: List[Union[str, bytes]]
+    # Optional; groups results in the candidate store (defaults to a hash of the JD)
+    requisition_id: str
 
     jd_result: Dict[str, Any]
     resume_results: List[Dict[str, Any]]
+    shortlist: List[int]
+    similarities: List[float]
+    # Why each resume missed the shortlist: "", "threshold" or "top_k"
+    shortlist_exclusions: List[str]
     rankings: List[Dict[str, Any]]
     emails: List[Dict[str, Any]]
     calendars: List[Dict[str, Any]]
     slacks: List[Dict[str, Any]]
+
+    # Items that failed at some stage: {"stage", "item", "error"}
+    dead_letters: List[Dict[str, Any]]
+    # Duplicate applicants, skipped before ranking:
+    # {"item", "duplicate_of", "similarity", "reason", "action"}
+    duplicates: List[Dict[str, Any]]
+
+    # Fan-out mode only: resume indices grouped by applicant, original first
+    resume_groups: List[List[Dict[str, Any]]]
+
+    # Fan-out mode only: one record per candidate, merged from parallel branches
+    candidates: Annotated[List[Dict[str, Any]], operator.add]
+
+class CandidateState(TypedDict):
+    """
+    Private state for one candidate's parse -> rank -> email -> calendar -> notify path.
+    """
+    index: int
+    resume_path: Union[str, bytes]
+    jd_result: Dict[str, Any]
+    # Optional display name for resume_path (defaults to describe_source)
+    label: str
+    # Duplicate copies of this resume, tried in order if it fails to parse:
+    # {"index", "resume_path", "similarity", "reason"}
+    alternates: List[Dict[str, Any]]
+
+    resume: Dict[str, Any]
+    ranking: Dict[str, Any]
+    email: Dict[str, Any]
+    calendar: Dict[str, Any]
+    slack: Dict[str, Any]
+    error: Optional[str]
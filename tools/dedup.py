@@ -0,0 +1,156 @@
+import hashlib
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from pydantic import BaseModel
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# An optional phone label, then a number-like run of digits and separators
+PHONE_RE = re.compile(
+    r"(?P<label>\b(?:phone|mobile|mob|cell|tel|telephone|contact|ph)\b[^\d+(\n]{0,15})?"
+    r"(?P<number>\+?\(?\d[\d ().-]{8,}\d)",
+    re.IGNORECASE,
+)
+
+class Fingerprint(BaseModel):
+    signature: bytes  # MinHash signature, one uint32 per permutation; empty for blank text
+    email: str
+    phone: str
+
+def shingles(text: str, size: int = 4) -> set:
+    """
+    Word n-grams over normalized text, so re-flowed or re-exported PDFs still match.
+    """
+    words = re.sub(r"[^a-z0-9@.+]+", " ", text.lower()).split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int, seed: int = 1):
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+    return a, b
+
+def minhash(shingle_set: set, num_perm: int = 128) -> np.ndarray:
+    """
+    MinHash signature: per permutation, the minimum of (a*h + b) mod p over all shingle hashes h.
+    """
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+         for s in shingle_set],
+        dtype=np.uint64,
+    )
+    a, b = _permutations(num_perm)
+    # a, b and h are all < 2**32, so a*h + b cannot overflow uint64
+    return (((np.outer(hashes, a) + b) % _PRIME) & _MAX_HASH).min(axis=0).astype(np.uint32)
+
+def _contact_phone(text: str) -> str:
+    """
+    The first phone number in the text, as its last ten digits; country codes
+    and formatting vary between copies.
+    Only phone-shaped numbers count: 10 to 15 digits, written with a "+", a
+    parenthesised area code or a phone label, and with no year-like group, so
+    date ranges such as "2019.06 - 2021.08" are never taken for a phone.
+    """
+    for match in PHONE_RE.finditer(text):
+        number = match.group("number")
+        if not (match.group("label") or number.startswith("+") or re.search(r"\(\d{1,5}\)", number)):
+            continue
+        groups = re.findall(r"\d+", number)
+        if any(len(group) == 4 and 1900 <= int(group) <= 2099 for group in groups):
+            continue
+        digits = "".join(groups)
+        if 10 <= len(digits) <= 15:
+            return digits[-10:]
+    return ""
+
+def fingerprint(text: str, num_perm: int = 128) -> Fingerprint:
+    """
+    What the duplicate check keeps per resume: the text's MinHash signature and
+    the contact details at the top of the resume (first email and phone number).
+    """
+    shingle_set = shingles(text)
+    email = EMAIL_RE.search(text)
+    return Fingerprint(
+        signature=minhash(shingle_set, num_perm).tobytes() if shingle_set else b"",
+        email=email.group(0).lower() if email else "",
+        phone=_contact_phone(text),
+    )
+
+class DuplicateIndex:
+    """
+    Matches each resume against the ones added before it.
+    - Near-duplicate text: MinHash signatures are bucketed by an LSH index
+      (bands x rows); bucket-mates whose estimated Jaccard similarity reaches
+      `threshold` are duplicates.
+    - Exact contact keys: the same email or phone number. A phone match is
+      ignored when both resumes give an email and the emails differ.
+    Duplicates stay indexed under their original, so a copy of a copy still
+    points at the first resume.
+    """
+
+    def __init__(self, threshold: float = 0.8, bands: int = 32):
+        self.threshold = threshold
+        self.bands = bands
+        self._signatures = {}
+        self._buckets = defaultdict(list)
+        self._contacts = {}
+        self._emails = {}
+        self._original = {}
+
+    def _match(self, fp: Fingerprint, signature: np.ndarray, keys: list) -> Optional[dict]:
+        candidates = {other for key in keys for other in self._buckets.get(key, ())}
+        best, best_similarity = None, 0.0
+        # Sorted so ties go to the earliest resume
+        for other in sorted(candidates):
+            similarity = float(np.mean(self._signatures[other] == signature))
+            if similarity > best_similarity:
+                best, best_similarity = other, similarity
+        if best is not None and best_similarity >= self.threshold:
+            return {
+                "duplicate_of": self._original[best],
+                "similarity": round(best_similarity, 3),
+                "reason": "near_duplicate_text",
+            }
+
+        for reason, key in (("same_email", fp.email), ("same_phone", fp.phone)):
+            if not key or key not in self._contacts:
+                continue
+            other = self._contacts[key]
+            if fp.email and self._emails[other] and fp.email != self._emails[other]:
+                continue
+            return {"duplicate_of": self._original[other], "similarity": 1.0, "reason": reason}
+        return None
+
+    def add(self, index: int, fp: Optional[Fingerprint]) -> Optional[dict]:
+        """
+        Returns {"duplicate_of", "similarity", "reason"} if an earlier resume
+        matches, else None. Call in input order: the first copy is the original.
+        """
+        if fp is None:
+            return None
+        signature = np.frombuffer(fp.signature, dtype=np.uint32)
+        rows = max(1, len(signature) // self.bands)
+        keys = [
+            (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for band in range(len(signature) // rows)
+        ]
+
+        match = self._match(fp, signature, keys)
+        self._original[index] = match["duplicate_of"] if match else index
+        self._emails[index] = fp.email
+        if len(signature):
+            self._signatures[index] = signature
+            for key in keys:
+                self._buckets[key].append(index)
+        for key in (fp.email, fp.phone):
+            if key:
+                self._contacts.setdefault(key, index)
+        return match
@@ -1,21 +1,36 @@
 import datetime
 import os
 import pickle
+import threading
 from googleapiclient.discovery import build
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from tools.metrics import METRICS
 
 # Google Calendar API scope
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
+TOKEN_FILE = "token.pickle"
 
-def get_calendar_service():
+# The Calendar API caps a batch request at 50 calls
+MAX_BATCH_SIZE = 50
+
+# One service object (and one set of credentials) per process.
+# httplib2 connections are not thread-safe, so every request goes through _lock.
+_service = None
+_creds = None
+_lock = threading.RLock()
+
+def _save_credentials(creds):
+    with open(TOKEN_FILE, "wb") as token:
+        pickle.dump(creds, token)
+
+def _load_credentials():
     """
-    Authenticates and returns a Google Calendar API service object.
+    Loads credentials from token.pickle, refreshing or running the OAuth flow as needed.
     - On the first run, opens a browser window for login.
     - Stores a token.pickle file for future reuse.
     """
     creds = None
-    token_file = "token.pickle"
     credentials_path = os.getenv("GOOGLE_CREDENTIALS_PATH")
 
     if not credentials_path or not os.path.exists(credentials_path):
@@ -24,8 +39,8 @@ def get_calendar_service():
         )
 
     # Load saved token if available
-    if os.path.exists(token_file):
-        with open(token_file, "rb") as token:
+    if os.path.exists(TOKEN_FILE):
+        with open(TOKEN_FILE, "rb") as token:
             creds = pickle.load(token)
 
     # If no valid creds, start the OAuth process
@@ -39,25 +54,45 @@ def get_calendar_service():
             creds = flow.run_local_server(port=0)
 
         # Save credentials for future use
-        with open(token_file, "wb") as token:
-            pickle.dump(creds, token)
+        _save_credentials(creds)
+
+    return creds
+
+def _refresh_if_expired():
+    """
+    Refreshes the shared credentials in place; callers must hold _lock.
+    """
+    if _creds is not None and _creds.expired and _creds.refresh_token:
+        _creds.refresh(Request())
+        _save_credentials(_creds)
 
-    return build("calendar", "v3", credentials=creds)
+def get_calendar_service(http=None):
+    """
+    Returns the process-wide Google Calendar API service object, building it
+    (and running discovery) only once.
+    Pass an httplib2-compatible http (e.g. googleapiclient.http.HttpMockSequence)
+    to get an uncached service backed by a fake transport instead.
+    """
+    global _service, _creds
 
+    if http is not None:
+        return build("calendar", "v3", http=http, cache_discovery=False)
 
-def create_event(
+    with _lock:
+        if _service is None:
+            _creds = _load_credentials()
+            _service = build("calendar", "v3", credentials=_creds, cache_discovery=False)
+        else:
+            _refresh_if_expired()
+        return _service
+
+def _build_event(
     summary: str,
     description: str,
     start_time: datetime.datetime,
     duration_minutes: int = 30,
-):
-    """
-    Creates an event in the user's primary Google Calendar
-    and returns the event's HTML link.
-    """
-    service = get_calendar_service()
-
-    event = {
+) -> dict:
+    return {
         "summary": summary,
         "description": description,
         "start": {
@@ -72,7 +107,51 @@ def create_event(
         },
     }
 
-    created_event = (
-        service.events().insert(calendarId="primary", body=event).execute()
-    )
+def create_event(
+    summary: str,
+    description: str,
+    start_time: datetime.datetime,
+    duration_minutes: int = 30,
+    service=None,
+):
+    """
+    Creates an event in the user's primary Google Calendar
+    and returns the event's HTML link.
+    """
+    event = _build_event(summary, description, start_time, duration_minutes)
+
+    with _lock:
+        service = service or get_calendar_service()
+        with METRICS.timed("api", "calendar.events_insert"):
+            created_event = (
+                service.events().insert(calendarId="primary", body=event).execute()
+            )
     return created_event.get("htmlLink")
+
+def create_events(events: list, service=None) -> list:
+    """
+    Creates many events using batch HTTP requests (one round trip per 50 events).
+    Each item takes the same keyword arguments as create_event.
+    Returns the HTML links in input order, with None for events that failed.
+    """
+    links = [None] * len(events)
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            print(f"[Google Calendar] Event {request_id} failed: {exception}")
+        else:
+            links[int(request_id)] = response.get("htmlLink")
+
+    with _lock:
+        service = service or get_calendar_service()
+        for offset in range(0, len(events), MAX_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for i, event in enumerate(events[offset: offset + MAX_BATCH_SIZE], start=offset):
+                batch.add(
+                    service.events().insert(calendarId="primary", body=_build_event(**event)),
+                    request_id=str(i),
+                )
+            with METRICS.timed("api", "calendar.batch_insert", events=min(MAX_BATCH_SIZE, len(events) - offset)):
+                batch.execute()
+
+    return links
@@ -0,0 +1,307 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from pydantic import ValidationError
+from tools.llm_scheduler import get_scheduler, priority_for
+from tools.metrics import METRICS
+from tools.prompt_encoding import estimate_tokens
+
+# Errors that will fail the same way on every attempt
+NON_RETRYABLE = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.PermissionDenied,
+    google_exceptions.Unauthenticated,
+    google_exceptions.NotFound,
+)
+
+def generate(model, prompt: str, agent: str, tokens_saved: int = 0, **kwargs):
+    """
+    Single entry point for model.generate_content calls made by the agents.
+    Records latency and prompt/response token counts per agent, plus the
+    estimated prompt tokens saved by tools.prompt_encoding.
+    """
+    model_name = getattr(model, "model_name", "unknown")
+    start = time.perf_counter()
+    try:
+        response = model.generate_content(prompt, **kwargs)
+    except Exception:
+        METRICS.observe("llm", agent, time.perf_counter() - start, model=model_name, status="error")
+        METRICS.inc("llm_errors", agent=agent)
+        raise
+
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    response_tokens = getattr(usage, "candidates_token_count", 0) or 0
+
+    METRICS.observe(
+        "llm", agent, time.perf_counter() - start,
+        model=model_name, status="ok",
+        prompt_tokens=prompt_tokens, response_tokens=response_tokens,
+        tokens_saved=tokens_saved,
+    )
+    METRICS.inc("llm_calls", agent=agent)
+    METRICS.inc("llm_prompt_tokens", prompt_tokens, agent=agent)
+    METRICS.inc("llm_response_tokens", response_tokens, agent=agent)
+    if tokens_saved:
+        METRICS.inc("llm_prompt_tokens_saved", tokens_saved, agent=agent)
+    return response
+
+def extract_json(text: str) -> dict:
+    """
+    Parses a model response as JSON, tolerating prose or code fences around the object.
+    """
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("Could not find a JSON object in the model's response.")
+        return json.loads(text[start:end + 1])
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+class CircuitBreaker:
+    """
+    Opens when the error rate over the last `window` calls reaches `threshold`.
+    After `cooldown` seconds one trial call is let through (half-open); its
+    outcome closes the circuit again or re-opens it.
+    """
+
+    def __init__(self, name: str, threshold: float = 0.5, window: int = 20, cooldown: float = 30.0):
+        self.name = name
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record(self, success: bool):
+        with self._lock:
+            if self._opened_at is not None and self._trial_in_flight:
+                self._trial_in_flight = False
+                if success:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                    print(f"[LLM] Circuit for {self.name} closed.")
+                else:
+                    self._opened_at = time.monotonic()
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (
+                self._opened_at is None
+                and len(self._outcomes) >= self.window // 2
+                and failures / len(self._outcomes) >= self.threshold
+            ):
+                self._opened_at = time.monotonic()
+                METRICS.inc("llm_circuit_opened", model=self.name)
+                print(f"[LLM] Circuit for {self.name} opened after {failures} failures in {len(self._outcomes)} calls.")
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+_pool = None
+
+def get_breaker(model_name: str, config: dict) -> CircuitBreaker:
+    """
+    Returns the process-wide circuit breaker for a model, shared by every agent using it.
+    """
+    with _breakers_lock:
+        if model_name not in _breakers:
+            _breakers[model_name] = CircuitBreaker(
+                model_name,
+                threshold=config.get("llm_circuit_error_rate", 0.5),
+                window=config.get("llm_circuit_window", 20),
+                cooldown=config.get("llm_circuit_cooldown", 30.0),
+            )
+        return _breakers[model_name]
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _breakers_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm")
+        return _pool
+
+class LLMExecutor:
+    """
+    Resilient wrapper around generate() shared by the agents.
+    - Each attempt has a deadline (llm_timeout seconds).
+    - If no answer arrives within the agent's p95 latency (at least
+      llm_hedge_min_delay), a duplicate request is sent and the first answer wins.
+    - Transient errors, timeouts and malformed/invalid JSON are retried up to
+      llm_max_retries times with full-jitter exponential backoff.
+    - Calls fail fast with CircuitOpenError while the model's circuit is open.
+    - Every request waits for the model's shared RPM/TPM quota (llm_rpm, llm_tpm)
+      in priority order; see tools.llm_scheduler.
+    """
+
+    def __init__(self, config: dict):
+        self.timeout = config.get("llm_timeout", 120.0)
+        self.max_retries = config.get("llm_max_retries", 3)
+        self.backoff_base = config.get("llm_backoff_base", 1.0)
+        self.hedge = config.get("llm_hedge", True)
+        self.hedge_min_delay = config.get("llm_hedge_min_delay", 2.0)
+        self.rpm = config.get("llm_rpm", 150)
+        self.tpm = config.get("llm_tpm", 2_000_000)
+        self.output_tokens = config.get("llm_output_token_estimate", 400)
+        self.run_priority = config.get("run_priority", "batch")
+        self.config = config
+
+    def _hedge_delay(self, agent: str):
+        """
+        p95 of this agent's recent latencies, or None until there are enough samples.
+        """
+        hist = METRICS.latencies.get(("llm", agent))
+        if not self.hedge or hist is None or hist.count < 20:
+            return None
+        return max(self.hedge_min_delay, hist.percentile(95))
+
+    def _scheduled_generate(self, scheduler, estimated_tokens: int, priority: int, acquire: bool,
+                            model, prompt: str, agent: str, tokens_saved: int, kwargs: dict):
+        if acquire:
+            scheduler.acquire(estimated_tokens, priority, agent)
+        response = generate(model, prompt, agent, tokens_saved, **kwargs)
+        usage = getattr(response, "usage_metadata", None)
+        scheduler.settle(
+            estimated_tokens,
+            (getattr(usage, "prompt_token_count", 0) or 0) + (getattr(usage, "candidates_token_count", 0) or 0),
+        )
+        return response
+
+    def _attempt(self, model, prompt: str, agent: str, tokens_saved: int, kwargs: dict):
+        pool = _get_pool()
+        # Every call, hedges included, is admitted by the model's shared quota
+        # scheduler; the deadline starts once the first call is admitted.
+        scheduler = get_scheduler(getattr(model, "model_name", "unknown"), rpm=self.rpm, tpm=self.tpm)
+        priority = priority_for(agent, self.run_priority)
+        estimated_tokens = estimate_tokens(prompt) + self.output_tokens
+        scheduler.acquire(estimated_tokens, priority, agent)
+
+        deadline = time.monotonic() + self.timeout
+        pending = {pool.submit(
+            self._scheduled_generate, scheduler, estimated_tokens, priority, False,
+            model, prompt, agent, tokens_saved, kwargs,
+        )}
+
+        hedge_delay = self._hedge_delay(agent)
+        if hedge_delay is not None and hedge_delay < self.timeout:
+            done, _ = wait(pending, timeout=hedge_delay)
+            if not done:
+                METRICS.inc("llm_hedges", agent=agent)
+                pending.add(pool.submit(
+                    self._scheduled_generate, scheduler, estimated_tokens, priority, True,
+                    model, prompt, agent, 0, kwargs,
+                ))
+
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                METRICS.inc("llm_timeouts", agent=agent)
+                raise TimeoutError(f"{agent} call exceeded {self.timeout}s deadline")
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def call(
+        self, model, prompt: str, agent: str, parse=None, tokens_saved: int = 0,
+        retry_malformed: bool = True, **kwargs,
+    ):
+        """
+        Runs generate() with deadlines, hedging and retries. When `parse` is given it
+        is applied to the response text and its result returned; a ValueError or
+        ValidationError from it counts as a malformed response and is retried
+        (unless retry_malformed is False).
+        """
+        breaker = get_breaker(getattr(model, "model_name", "unknown"), self.config)
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {breaker.name}; skipping {agent} call")
+            try:
+                response = self._attempt(model, prompt, agent, tokens_saved, kwargs)
+            except NON_RETRYABLE:
+                breaker.record(True)
+                raise
+            except Exception as e:
+                breaker.record(False)
+                if attempt == self.max_retries:
+                    raise
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                breaker.record(True)
+                if parse is None:
+                    return response
+                try:
+                    return parse(response.text)
+                except (ValueError, ValidationError) as e:
+                    if attempt == self.max_retries or not retry_malformed:
+                        raise
+                    reason = f"malformed response: {e}"
+
+            METRICS.inc("llm_retries", agent=agent)
+            delay = random.uniform(0, self.backoff_base * 2 ** attempt)
+            print(f"[LLM] {agent} attempt {attempt + 1} failed ({reason}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def cascade(self, fast_model, model, prompt: str, agent: str, parse, escalate=None, **kwargs):
+        """
+        Model cascade: tries fast_model first and escalates to `model` when the fast
+        answer fails to parse/validate, the fast call fails, or escalate(result) is
+        True. With fast_model=None this is a plain call() on `model`.
+        Calls are counted per tier in llm_tier_calls.
+        """
+        if fast_model is None:
+            METRICS.inc("llm_tier_calls", agent=agent, tier="primary")
+            return self.call(model, prompt, agent, parse=parse, **kwargs)
+
+        METRICS.inc("llm_tier_calls", agent=agent, tier="fast")
+        try:
+            result = self.call(fast_model, prompt, agent, parse=parse, retry_malformed=False, **kwargs)
+            if escalate is None or not escalate(result):
+                return result
+            reason = "borderline"
+        except Exception as e:
+            reason = "malformed" if isinstance(e, (ValueError, ValidationError)) else "error"
+
+        METRICS.inc("llm_escalations", agent=agent, reason=reason)
+        METRICS.inc("llm_tier_calls", agent=agent, tier="strong")
+        return self.call(model, prompt, agent, parse=parse, **kwargs)
+
+def load_model(config: dict, registry, model_name: str):
+    """
+    Returns the shared client for model_name from the registry, or a fresh GenerativeModel.
+    """
+    if registry is not None:
+        return registry.model(model_name)
+    genai.configure(api_key=config["gemini_key"])
+    return genai.GenerativeModel(model_name)
+
+def load_fast_model(config: dict, registry, model_name: str):
+    """
+    The first-pass model when model_cascade is on and it differs from the agent's model, else None.
+    """
+    fast_name = config.get("cascade_fast_model", "gemini-2.5-flash")
+    if not config.get("model_cascade") or fast_name == model_name:
+        return None
+    return load_model(config, registry, fast_name)
@@ -0,0 +1,119 @@
+import heapq
+import itertools
+import threading
+import time
+from tools.metrics import METRICS
+
+# Lower runs first. Interactive (Streamlit) work outranks batch (CLI) work queued
+# in the same process; within a run class, ranking beats parsing, which beats
+# email drafting.
+RUN_PRIORITY = {"interactive": 0, "batch": 10}
+AGENT_PRIORITY = {"JDAnalyzer": 0, "CandidateRanker": 1, "ResumeParser": 2, "EmailGenerator": 3}
+
+def priority_for(agent: str, run_priority: str = "batch") -> int:
+    return RUN_PRIORITY.get(run_priority, RUN_PRIORITY["batch"]) + AGENT_PRIORITY.get(agent, 5)
+
+class QuotaScheduler:
+    """
+    Admits Gemini calls for one model under its requests-per-minute and
+    tokens-per-minute quota.
+    - Both quotas are token buckets refilled continuously; a call reserves one
+      request plus its estimated tokens, and settle() corrects the estimate
+      with the real usage once the response arrives.
+    - Waiting calls are served strictly by priority (then arrival order), so a
+      low-priority backlog never delays ranking or interactive work.
+    - rpm / tpm of 0 disable that limit.
+    - Queue and quota live in this process only. A Streamlit server and a cron
+      CLI run each have their own, so priority does not order calls between
+      them, and their rpm/tpm should add up to the account's quota.
+    """
+
+    def __init__(self, model_name: str, rpm: float = 150, tpm: float = 2_000_000):
+        self.model_name = model_name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self.updated = time.monotonic()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        if self.rpm:
+            self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60)
+
+    def _try_reserve(self, tokens: int) -> float:
+        """
+        Reserves quota and returns 0, or returns the seconds until enough quota refills.
+        """
+        self._refill()
+        # A single call larger than the whole TPM quota waits for a full bucket
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        waits = []
+        if self.rpm and self.requests < 1:
+            waits.append((1 - self.requests) * 60 / self.rpm)
+        if self.tpm and self.tokens < tokens:
+            waits.append((tokens - self.tokens) * 60 / self.tpm)
+        if waits:
+            return max(waits)
+        if self.rpm:
+            self.requests -= 1
+        self.tokens -= tokens
+        return 0.0
+
+    def _publish_depth(self):
+        METRICS.set_gauge("llm_queue_depth", len(self._waiting), model=self.model_name)
+
+    def acquire(self, tokens: int, priority: int, agent: str):
+        """
+        Blocks until this call is at the head of the queue and the quota allows it.
+        """
+        start = time.monotonic()
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            self._publish_depth()
+            try:
+                while True:
+                    if self._waiting[0] == entry:
+                        wait = self._try_reserve(tokens)
+                        if wait == 0:
+                            break
+                        self._cond.wait(timeout=wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._publish_depth()
+                self._cond.notify_all()
+        METRICS.observe("queue", agent, time.monotonic() - start, model=self.model_name, priority=priority)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Charges (or refunds) the difference between estimated and actual token usage.
+        """
+        if not self.tpm or not actual_tokens:
+            return
+        with self._cond:
+            self.tokens = min(self.tpm, self.tokens - (actual_tokens - estimated_tokens))
+            self._cond.notify_all()
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(model_name: str, **kwargs) -> QuotaScheduler:
+    """
+    Returns the process-wide scheduler for a model, so every agent calling it
+    shares one queue and one quota.
+    """
+    with _schedulers_lock:
+        if model_name not in _schedulers:
+            _schedulers[model_name] = QuotaScheduler(model_name, **kwargs)
+        return _schedulers[model_name]
@@ -0,0 +1,182 @@
+import bisect
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency histogram buckets (seconds), Prometheus-style upper bounds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+class Histogram:
+    def __init__(self, max_samples: int = 10000):
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=max_samples)
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+class Metrics:
+    """
+    Process-wide latency histograms and counters.
+    - Latencies are keyed by (kind, name): kind is "node", "llm", "queue", "api" or "pdf".
+    - Counters cover tokens, retries and cache hits/misses, with free-form labels.
+    - Gauges hold current values such as LLM queue depth.
+    - Every observation can also be appended to a JSONL trace file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(Histogram)
+        self.counters = defaultdict(float)
+        self.gauges = {}
+        self.trace_path = None
+        self._server = None
+
+    def configure(self, trace_path: str = None, port: int = None, host: str = "127.0.0.1"):
+        if trace_path:
+            self.trace_path = trace_path
+        if port and self._server is None:
+            self.serve(port, host)
+
+    def reset(self):
+        """
+        Clears all histograms and counters (e.g. between benchmark runs).
+        """
+        with self._lock:
+            self.latencies.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def observe(self, kind: str, name: str, seconds: float, **fields):
+        with self._lock:
+            self.latencies[(kind, name)].observe(seconds)
+            if self.trace_path:
+                event = {"ts": time.time(), "kind": kind, "name": name, "seconds": round(seconds, 4)}
+                event.update(fields)
+                with open(self.trace_path, "a") as f:
+                    f.write(json.dumps(event, default=str) + "\n")
+
+    def inc(self, counter: str, value: float = 1, **labels):
+        with self._lock:
+            self.counters[(counter, tuple(sorted(labels.items())))] += value
+
+    def set_gauge(self, gauge: str, value: float, **labels):
+        with self._lock:
+            self.gauges[(gauge, tuple(sorted(labels.items())))] = value
+
+    @contextmanager
+    def timed(self, kind: str, name: str, **fields):
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.observe(kind, name, time.perf_counter() - start, status=status, **fields)
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# TYPE hrcopilot_latency_seconds histogram",
+        ]
+        with self._lock:
+            for (kind, name), hist in sorted(self.latencies.items()):
+                labels = {"kind": kind, "name": name}
+                cumulative = 0
+                for bound, count in zip(list(BUCKETS) + ["+Inf"], hist.bucket_counts):
+                    cumulative += count
+                    lines.append(
+                        f"hrcopilot_latency_seconds_bucket{_labels({**labels, 'le': bound})} {cumulative}"
+                    )
+                lines.append(f"hrcopilot_latency_seconds_sum{_labels(labels)} {hist.total}")
+                lines.append(f"hrcopilot_latency_seconds_count{_labels(labels)} {hist.count}")
+
+            for (counter, labels), value in sorted(self.counters.items()):
+                lines.append(f"hrcopilot_{counter}_total{_labels(dict(labels))} {value:g}")
+
+            for (gauge, labels), value in sorted(self.gauges.items()):
+                lines.append(f"hrcopilot_{gauge}{_labels(dict(labels))} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def summary_table(self) -> str:
+        rows = [("kind", "name", "calls", "total s", "p50 s", "p95 s")]
+        with self._lock:
+            for (kind, name), hist in sorted(self.latencies.items()):
+                rows.append((
+                    kind, name, str(hist.count), f"{hist.total:.2f}",
+                    f"{hist.percentile(50):.3f}", f"{hist.percentile(95):.3f}",
+                ))
+            counters = sorted(self.counters.items()) + sorted(self.gauges.items())
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+
+        if counters:
+            lines.append("")
+            for (counter, labels), value in counters:
+                label_text = ", ".join(f"{k}={v}" for k, v in labels)
+                lines.append(f"{counter}{f' ({label_text})' if label_text else ''}: {value:g}")
+        return "\n".join(lines)
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """
+        Exposes prometheus_text() at http://<host>:<port>/metrics from a daemon thread.
+        If the port is taken (e.g. by another pipeline process), logs a warning
+        and carries on without the endpoint.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"[Metrics] Warning: could not serve metrics on {host}:{port} ({e}); continuing without it")
+            return
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"[Metrics] Prometheus metrics at http://{host}:{port}/metrics")
+
+
+METRICS = Metrics()
+
+def instrument_node(name: str, fn):
+    """
+    Wraps a graph node so its wall time is recorded under ("node", name).
+    """
+    def wrapped(state):
+        with METRICS.timed("node", name):
+            return fn(state)
+    return wrapped
@@ -0,0 +1,132 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Union
+import pymupdf
+import pdfplumber
+from pydantic import BaseModel
+from tools.metrics import METRICS
+
+# A resume PDF given as a file path or as in-memory bytes / buffer (e.g. a Streamlit upload)
+PdfSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+class ExtractionResult(BaseModel):
+    text: str
+    pages: int
+    seconds: float
+    engine: str
+
+def read_pdf_bytes(source: PdfSource) -> bytes:
+    """
+    Returns the PDF's bytes, reading paths from disk and buffers from their start.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+def describe_source(source: PdfSource) -> str:
+    """
+    A short label for logs and dead letters: the path, the buffer's name, or a content hash.
+    """
+    if isinstance(source, str):
+        return source
+    name = getattr(source, "name", None)
+    if isinstance(name, str):
+        return name
+    digest = hashlib.sha256(read_pdf_bytes(source)).hexdigest()[:12]
+    return f"<in-memory PDF {digest}>"
+
+def _extract_with_pymupdf(source: Union[str, bytes]):
+    doc = pymupdf.open(source) if isinstance(source, str) else pymupdf.open(stream=source, filetype="pdf")
+    with doc:
+        return "\n".join(page.get_text() for page in doc), doc.page_count
+
+def _extract_with_pdfplumber(source: Union[str, bytes]):
+    with pdfplumber.open(source if isinstance(source, str) else io.BytesIO(source)) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages), len(pdf.pages)
+
+def _looks_garbled(text: str, pages: int, min_chars_per_page: int) -> bool:
+    """
+    PyMuPDF struggles with some layouts (scanned-then-OCR'd, odd font encodings):
+    it then returns almost no text or lots of replacement characters.
+    """
+    stripped = text.strip()
+    if len(stripped) < min_chars_per_page * max(pages, 1):
+        return True
+    return stripped.count("�") > 0.05 * len(stripped)
+
+def extract_pdf_text(
+    pdf_path: Union[str, bytes], engine: str = "pymupdf", min_chars_per_page: int = 40
+) -> ExtractionResult:
+    """
+    Extracts text from a PDF path or PDF bytes with PyMuPDF, and falls back to
+    pdfplumber when the PyMuPDF output looks wrong. Safe to run in a worker process.
+    """
+    start = time.perf_counter()
+    if engine == "pymupdf":
+        try:
+            text, pages = _extract_with_pymupdf(pdf_path)
+            if not _looks_garbled(text, pages, min_chars_per_page):
+                return ExtractionResult(
+                    text=text, pages=pages,
+                    seconds=time.perf_counter() - start, engine="pymupdf",
+                )
+        except Exception:
+            pass
+
+    text, pages = _extract_with_pdfplumber(pdf_path)
+    return ExtractionResult(
+        text=text, pages=pages,
+        seconds=time.perf_counter() - start, engine="pdfplumber",
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn avoids forking a process that already has threads running
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+class PdfExtractor:
+    """
+    Runs PDF extraction in a shared process pool so CPU-bound parsing
+    scales across cores and doesn't hold up threads waiting on the LLM.
+    Set pdf_workers to 0 to extract in the calling thread instead.
+    """
+
+    def __init__(self, config: dict):
+        self.engine = config.get("pdf_engine", "pymupdf")
+        self.workers = config.get("pdf_workers", os.cpu_count() or 1)
+
+    def extract(self, source: PdfSource) -> ExtractionResult:
+        """
+        Accepts a path or any in-memory source; buffers are never written to disk.
+        """
+        # Paths and bytes go to the extractor as-is; other buffers become bytes (picklable)
+        pdf_path = source if isinstance(source, (str, bytes)) else read_pdf_bytes(source)
+        if self.workers <= 0:
+            result = extract_pdf_text(pdf_path, self.engine)
+        else:
+            result = _get_pool(self.workers).submit(extract_pdf_text, pdf_path, self.engine).result()
+        METRICS.observe("pdf", result.engine, result.seconds, pages=result.pages)
+        return result
@@ -0,0 +1,59 @@
+import json
+from typing import Iterable, Optional
+from pydantic import BaseModel
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate (~4 characters per token) used for budgets and batch sizing.
+    """
+    return len(text) // 4 + 1
+
+class EncodedPayload(BaseModel):
+    text: str
+    tokens: int
+    tokens_saved: int  # versus the full payload as json.dumps(..., indent=2)
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+def _shrink(value, max_chars: int):
+    """
+    Drops empty values and cuts long strings (e.g. project descriptions) to max_chars.
+    """
+    if isinstance(value, dict):
+        return {k: _shrink(v, max_chars) for k, v in value.items() if not _is_empty(v)}
+    if isinstance(value, list):
+        return [_shrink(v, max_chars) for v in value if not _is_empty(v)]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars].rstrip() + "…"
+    return value
+
+class PromptEncoder:
+    """
+    Serializes JD/resume payloads for prompts with as few tokens as possible.
+    - Keeps only the fields an agent asks for.
+    - Drops empty values and truncates any string over prompt_field_token_budget tokens.
+    - Emits minimal JSON (no indentation or spaces after separators).
+    prompt_encoding="verbose" restores the full, indented payloads.
+    """
+
+    def __init__(self, config: dict):
+        self.compact = config.get("prompt_encoding", "compact") != "verbose"
+        self.field_token_budget = config.get("prompt_field_token_budget", 60)
+
+    def encode(self, data: dict, fields: Optional[Iterable[str]] = None) -> EncodedPayload:
+        verbose = json.dumps(data, indent=2)
+        if not self.compact:
+            return EncodedPayload(text=verbose, tokens=estimate_tokens(verbose), tokens_saved=0)
+
+        if fields is not None:
+            data = {field: data[field] for field in fields if field in data}
+        text = json.dumps(
+            _shrink(data, self.field_token_budget * 4),
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        tokens = estimate_tokens(text)
+        return EncodedPayload(
+            text=text, tokens=tokens, tokens_saved=max(0, estimate_tokens(verbose) - tokens)
+        )
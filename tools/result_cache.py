@@ -0,0 +1,178 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from tools.metrics import METRICS
+
+class ResultCache:
+    """
+    A persistent key/value cache backed by SQLite.
+    - Values are stored as text (typically a pydantic model's JSON dump).
+    - Once more than max_entries are stored, the least recently used entries are evicted.
+    - Entries older than ttl seconds (if set) are treated as misses and dropped.
+    - An optional in-process LRU tier of memory_entries sits in front of SQLite.
+    - Tracks hit/miss counters for the lifetime of the instance.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        ttl: Optional[float] = None,
+        memory_entries: int = 0,
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+        if "created_at" not in columns:
+            # Caches written before TTL support: treat existing entries as fresh
+            self._conn.execute(
+                "ALTER TABLE cache ADD COLUMN created_at REAL NOT NULL DEFAULT 0"
+            )
+            self._conn.execute("UPDATE cache SET created_at = ?", (time.time(),))
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Builds a content-addressed key from raw bytes and/or strings.
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key: str, value: str, created_at: float):
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                value, created_at = self._memory[key]
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    METRICS.inc("cache_hits", cache=self.name, tier="memory")
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                METRICS.inc("cache_misses", cache=self.name)
+                return None
+
+            value, created_at = row
+            if self._expired(created_at, now):
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                METRICS.inc("cache_misses", cache=self.name)
+                return None
+
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._remember(key, value, created_at)
+            self.hits += 1
+            METRICS.inc("cache_hits", cache=self.name, tier="disk")
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, value, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+            self._remember(key, value, now)
+
+    def _evict(self, now: float):
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM cache WHERE created_at < ?", (now - self.ttl,)
+            )
+
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM cache WHERE key IN (
+                    SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "entries": entries,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(path: str, **kwargs) -> ResultCache:
+    """
+    Returns a process-wide ResultCache for the given path, so every agent
+    instance shares one connection and one set of counters.
+    """
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = ResultCache(path, **kwargs)
+        return _caches[path]
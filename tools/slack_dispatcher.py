@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from slack_sdk.errors import SlackApiError
+from tools.slack_notifier import SlackNotifier, SlackResult
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self):
+        """
+        Empties the bucket, e.g. after Slack tells us to back off.
+        """
+        with self._lock:
+            self.tokens = 0
+            self.updated = time.monotonic()
+
+class SlackDispatcher:
+    """
+    Sends Slack messages from a background thread so callers never wait on Slack.
+    - A token bucket keeps us under the chat.postMessage rate tier.
+    - HTTP 429 responses are retried after the Retry-After delay Slack asks for.
+    - submit() returns a Future that resolves to a SlackResult once delivered.
+    """
+
+    def __init__(
+        self,
+        notifier: SlackNotifier,
+        rate_per_second: float = 1.0,
+        burst: int = 3,
+        max_retries: int = 3,
+    ):
+        self.notifier = notifier
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_retries = max_retries
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="slack-dispatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, message: str, blocks: list = None) -> Future:
+        future = Future()
+        self._queue.put((message, blocks, future))
+        return future
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Blocks until every queued message has been delivered (or failed).
+        Returns False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _run(self):
+        while True:
+            message, blocks, future = self._queue.get()
+            try:
+                future.set_result(self._deliver(message, blocks))
+            except Exception as e:
+                future.set_result(
+                    SlackResult(status=f"failed: {e}", channel=self.notifier.channel, message=message)
+                )
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, message: str, blocks: list) -> SlackResult:
+        channel = self.notifier.channel
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                self.notifier.post_message(message, blocks)
+                return SlackResult(status="sent", channel=channel, message=message)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt == self.max_retries:
+                    return SlackResult(
+                        status=f"failed: {e.response['error']}", channel=channel, message=message
+                    )
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+                print(f"[SlackDispatcher] Rate limited, retrying in {retry_after:.0f}s")
+                self.bucket.drain()
+                time.sleep(retry_after)
+
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+def get_dispatcher(notifier: SlackNotifier, **kwargs) -> SlackDispatcher:
+    """
+    Returns the process-wide dispatcher for the notifier's token and channel,
+    so all notifications share one queue and one rate limit.
+    """
+    key = (notifier.client.token, notifier.channel)
+    with _dispatchers_lock:
+        if key not in _dispatchers:
+            _dispatchers[key] = SlackDispatcher(notifier, **kwargs)
+        return _dispatchers[key]
+
+def flush_all(timeout: float = None) -> bool:
+    """
+    Waits for every dispatcher's queue to drain; call before the process exits.
+    """
+    with _dispatchers_lock:
+        dispatchers = list(_dispatchers.values())
+    return all(dispatcher.flush(timeout) for dispatcher in dispatchers)
@@ -2,6 +2,7 @@ from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from pydantic import BaseModel
 import os
+from tools.metrics import METRICS
 
 class SlackResult(BaseModel):
     status: str
@@ -17,9 +18,17 @@ class SlackNotifier:
         self.client = WebClient(token=token, timeout=60)
         self.channel = channel
 
-    def send_message(self, message: str) -> SlackResult:
+    def post_message(self, message: str, blocks: list = None):
+        """
+        Posts a message (optionally as block kit) and lets SlackApiError propagate,
+        so callers can inspect rate-limit responses.
+        """
+        with METRICS.timed("api", "slack.chat_postMessage"):
+            return self.client.chat_postMessage(channel=self.channel, text=message, blocks=blocks)
+
+    def send_message(self, message: str, blocks: list = None) -> SlackResult:
         try:
-            self.client.chat_postMessage(channel=self.channel, text=message)
+            self.post_message(message, blocks)
             return SlackResult(status="sent", channel=self.channel, message=message)
         except SlackApiError as e:
             return SlackResult(